@@ -0,0 +1,44 @@
+"""
+Benchmark: multi-candidate deck builder (throughput and memory).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_deck_builder --candidates 100
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import sample_one_pager
+from benchmarks.memory import current_rss_mb, peak_rss_mb
+from deck_builder import build_deck
+
+
+def candidates(n, rss_samples, every):
+    """Generates the one-pagers lazily, sampling RSS as the deck grows."""
+    for i in range(n):
+        if i % every == 0:
+            rss_samples.append((i, current_rss_mb()))
+        yield sample_one_pager(i)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--output", default=None, help="Optional path to keep the generated deck")
+    args = parser.parse_args()
+
+    rss_samples = []
+    baseline_rss = current_rss_mb()
+    start = time.perf_counter()
+    deck = build_deck(candidates(args.candidates, rss_samples, max(1, args.candidates // 10)), output_path=args.output)
+    elapsed = time.perf_counter() - start
+
+    print(f"candidates       : {args.candidates}")
+    print(f"total            : {elapsed:.2f}s ({args.candidates / elapsed:.1f} one-pagers/s)")
+    print(f"deck size        : {deck.getbuffer().nbytes / (1024 * 1024):.1f} MB")
+    print(f"RSS before build : {baseline_rss:.1f} MB")
+    print("RSS while adding : " + ", ".join(f"#{i}={rss:.0f}MB" for i, rss in rss_samples))
+    print(f"peak RSS         : {peak_rss_mb():.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
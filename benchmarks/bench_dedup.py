@@ -0,0 +1,84 @@
+"""
+Benchmark: near-duplicate lookups in the MinHash/LSH index with tens of thousands of stored CVs.
+
+Indexes synthetic CV texts, then looks up lightly edited copies (should be found) and new CVs
+(should not), reporting signature time, lookup latency percentiles, recall and load time.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_dedup --cvs 20000 --queries 500
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic_pdf import synthetic_cv_lines
+from dedup_index import DedupIndex, minhash_signature
+
+
+def edited_copy(lines, rng):
+    """Re-export with minor edits: a couple of lines changed and one added."""
+    lines = list(lines)
+    for _ in range(2):
+        lines[rng.randrange(2, len(lines))] = f"Updated line {rng.random():.6f}."
+    lines.append("References available on request.")
+    return "\n".join(lines)
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cvs", type=int, default=20000, help="CVs stored in the index")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=60, help="Lines per synthetic CV")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dedup_index.sqlite")
+
+        start = time.perf_counter()
+        stored = [synthetic_cv_lines(args.lines, seed=i) for i in range(args.cvs)]
+        signatures = [minhash_signature("\n".join(lines)) for lines in stored]
+        signing = (time.perf_counter() - start) / args.cvs
+        print(f"🔹 signature: {signing * 1000:.2f} ms per CV")
+
+        start = time.perf_counter()
+        DedupIndex(path).add_many((f"cv-{i}", signature, {"file": f"cv-{i}.pdf"}) for i, signature in enumerate(signatures))
+        print(f"🔹 indexed {args.cvs} CVs in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        index = DedupIndex(path)
+        print(f"🔹 index opened (signatures loaded, buckets rebuilt) in {time.perf_counter() - start:.2f}s")
+
+        targets = [rng.randrange(args.cvs) for _ in range(args.queries)]
+        duplicates = [minhash_signature(edited_copy(stored[i], rng)) for i in targets]
+        new_cvs = [minhash_signature("\n".join(synthetic_cv_lines(args.lines, seed=args.cvs + i)))
+                   for i in range(args.queries)]
+
+        latencies, found, false_positives = [], 0, 0
+        for target, signature in zip(targets, duplicates):
+            start = time.perf_counter()
+            match = index.find_duplicate(signature=signature)
+            latencies.append(time.perf_counter() - start)
+            found += match is not None and match[0] == f"cv-{target}"
+        for signature in new_cvs:
+            start = time.perf_counter()
+            match = index.find_duplicate(signature=signature)
+            latencies.append(time.perf_counter() - start)
+            false_positives += match is not None
+
+    print(f"🔹 lookup: p50 {percentile(latencies, 0.5) * 1e6:.0f} µs  p99 {percentile(latencies, 0.99) * 1e6:.0f} µs  "
+          f"mean {statistics.mean(latencies) * 1e6:.0f} µs")
+    print(f"✅ recall on edited copies {found / args.queries:.1%}, false positives on new CVs "
+          f"{false_positives / args.queries:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: memory and time spent on a CV upload before the first LLM call (ingest_guard.py).
+
+Every case runs in a fresh interpreter and reports its wall time and the peak RSS it added
+over the interpreter's baseline:
+- a --big-pages synthetic PDF (portfolio-sized) extracted whole, as before the guard;
+- the same PDF through prepare_cv_text, rejected by the page limit before parsing any page;
+- a regular 3-page CV through prepare_cv_text.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_ingest --big-pages 200 --output bench_ingest.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_SNIPPET = """
+import json, os, resource, time
+from benchmarks.memory import current_rss_mb
+baseline = current_rss_mb()
+start = time.perf_counter()
+error = None
+try:
+{body}
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+print(json.dumps({{"seconds": time.perf_counter() - start, "error": error,
+                  "peak_added_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - baseline}}))
+"""
+
+# Imports happen before the baseline is taken in every case, so only the work itself is measured
+_PRELUDE = "import cv_process_sort_gen as cv, pdfplumber\n"
+
+
+def run_case(body):
+    code = _PRELUDE + _SNIPPET.format(body="\n".join("    " + line for line in body.strip().splitlines()))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--big-pages", type=int, default=200, help="Pages of the oversized PDF")
+    parser.add_argument("--output", help="Optional JSON file with the results")
+    args = parser.parse_args()
+
+    from benchmarks.synthetic_pdf import make_synthetic_cv_pdf
+
+    with tempfile.TemporaryDirectory() as tmp:
+        big, small = os.path.join(tmp, "portfolio.pdf"), os.path.join(tmp, "cv.pdf")
+        make_synthetic_cv_pdf(big, n_pages=args.big_pages)
+        make_synthetic_cv_pdf(small, n_pages=3)
+
+        cases = {
+            "big_pdf_unguarded": f"text = cv.extract_text_from_pdf({big!r})",
+            "big_pdf_guarded": f"cv.prepare_cv_text({big!r})",
+            "cv_guarded": f"cv.prepare_cv_text({small!r})",
+        }
+        results = {}
+        for name, body in cases.items():
+            results[name] = run_case(body)
+            outcome = results[name]["error"] or "ok"
+            print(f"🔹 {name:<18} {results[name]['seconds'] * 1000:8.0f} ms   "
+                  f"peak +{results[name]['peak_added_mb']:6.1f} MB   {outcome[:90]}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: write + read time of the intermediate one-pager file per format (jsonl, parquet, excel).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_intermediate --repeat 50
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fixtures import sample_one_pager
+from one_pager_io import EXTENSIONS, load_one_pager, save_one_pager
+
+
+def bench_format(one_pager, fmt, repeat, directory):
+    path = os.path.join(directory, f"one_pager{EXTENSIONS[fmt]}")
+    save_one_pager(one_pager, path, fmt)  # warm-up: first call pays the imports
+    load_one_pager(path, fmt)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        save_one_pager(one_pager, path, fmt)
+    written = time.perf_counter()
+    for _ in range(repeat):
+        load_one_pager(path, fmt)
+    read = time.perf_counter()
+    return (written - start) / repeat, (read - written) / repeat, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--formats", nargs="*", default=["jsonl", "parquet", "excel"])
+    args = parser.parse_args()
+
+    one_pager = sample_one_pager()
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            try:
+                write_s, read_s, size = bench_format(one_pager, fmt, args.repeat, tmp)
+            except ImportError as e:
+                print(f"{fmt:<8} skipped: {e}")
+                continue
+            print(f"{fmt:<8} write {write_s * 1000:7.2f} ms  read {read_s * 1000:7.2f} ms  size {size / 1024:6.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
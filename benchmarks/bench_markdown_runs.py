@@ -0,0 +1,91 @@
+"""
+Micro-benchmark: cost of writing the one-pager text into the slide (markup -> styled runs), per deck.
+
+Compares the previous approach (assign text_frame.text, re-split every paragraph with an
+uncompiled regex, remove and rebuild the runs, then restyle them) with the single-pass
+write_section of populate_pptx. Template loading and saving are left out.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_markdown_runs --decks 200
+"""
+import argparse
+import re
+import time
+
+from pptx.dml.color import RGBColor
+from pptx.util import Pt
+
+from benchmarks.fixtures import sample_one_pager
+from populate_pptx import BULLET_SECTIONS, fill_slide, load_template
+
+
+def _legacy_bold(paragraph):
+    parts = re.split(r'(\*\*.*?\*\*)', paragraph.text)
+    for _ in range(len(paragraph.runs)):
+        paragraph._element.remove(paragraph.runs[0]._r)
+    for part in parts:
+        run = paragraph.add_run()
+        if part.startswith("**") and part.endswith("**"):
+            run.text = part[2:-2]
+            run.font.bold = True
+        else:
+            run.text = part
+
+
+def legacy_fill_slide(slide, df_text, shape_index):
+    """fill_slide as it was before the single-pass renderer (baseline)."""
+    shapes = list(slide.shapes)
+    for _, row in df_text.iterrows():
+        section_name = row["section_name"].strip().lower()
+        new_text = str(row["output"]).strip()
+        for position in shape_index.get(section_name, ()):
+            text_frame = shapes[position].text_frame
+            text_frame.clear()
+            lines = new_text.splitlines()
+            if section_name.startswith("role"):
+                formatted = "\n".join([f"**{lines[0].strip()}**"] + [f"• {line}" for line in lines[1:]])
+            elif section_name in BULLET_SECTIONS:
+                formatted = "\n".join(f"• {line}" for line in lines)
+            else:
+                formatted = "\n".join(lines)
+            text_frame.text = formatted
+            for paragraph in text_frame.paragraphs:
+                _legacy_bold(paragraph)
+                if section_name in ("name", "tower"):
+                    run = paragraph.runs[0]
+                    run.font.name = "Graphik Black"
+                    run.font.size = Pt(42 if section_name == "name" else 24)
+                    run.font.color.rgb = RGBColor(255, 255, 255)
+                    run.text = run.text.upper().strip()
+                else:
+                    for run in paragraph.runs:
+                        run.font.name = "Graphik"
+                        run.font.size = Pt(9)
+                        run.font.color.rgb = RGBColor(0, 0, 0)
+
+
+def bench(fill, one_pager, decks):
+    # Fresh template copies are made up front so only the text writing is timed
+    copies = [load_template() for _ in range(decks)]
+    start = time.perf_counter()
+    for prs, shape_index in copies:
+        fill(prs.slides[0], one_pager, shape_index)
+    return (time.perf_counter() - start) / decks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--decks", type=int, default=200)
+    args = parser.parse_args()
+
+    one_pager = sample_one_pager()
+    bench(fill_slide, one_pager, 3)  # warm-up
+    # The legacy renderer walked the DataFrame of earlier versions with iterrows()
+    legacy = bench(legacy_fill_slide, one_pager.to_dataframe(), args.decks)
+    single_pass = bench(fill_slide, one_pager, args.decks)
+    print(f"legacy (rebuild + restyle): {legacy * 1000:.2f} ms/deck")
+    print(f"single pass:                {single_pass * 1000:.2f} ms/deck  ({legacy / single_pass:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: OnePager model vs the two-column pandas DataFrame it replaced as the hand-off
+between generation and rendering.
+
+Times building one from the parsed sections, a JSON round trip (job queue result), looking up
+every template section (what fill_slide does) and measures the memory of holding many of them,
+plus the cold import of pandas that the batch workers no longer pay.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_one_pager_model --one-pagers 2000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fixtures import SAMPLE_ROLES, SAMPLE_SECTIONS
+from one_pager import OnePager
+
+# Text shapes of the template that fill_slide looks up
+LOOKUPS = [name.lower() for name in SAMPLE_SECTIONS] + [f"role_{i + 1}" for i in range(4)]
+
+
+def build_dataframe(sections, roles):
+    """build_one_pager_df as it was."""
+    import pandas as pd
+
+    rows = dict(sections)
+    for i, role in enumerate(roles):
+        rows[f"Role_{i + 1}"] = role
+    return pd.DataFrame(list(rows.items()), columns=["section_name", "output"])
+
+
+def dataframe_lookup(df, section_name):
+    match = df.loc[df["section_name"].str.strip().str.lower() == section_name, "output"]
+    return match.iloc[0] if len(match) else None
+
+
+def per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def memory_per_object(build, n):
+    tracemalloc.start()
+    objects = [build(i) for i in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--one-pagers", type=int, default=2000, help="Objects held for the memory measurement")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import pandas"], check=True)
+    pandas_import = time.perf_counter() - start
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import one_pager"], check=True)
+    model_import = time.perf_counter() - start
+    print(f"🔹 python -c 'import ...' (interpreter start included): pandas {pandas_import * 1000:.0f} ms, one_pager {model_import * 1000:.0f} ms")
+
+    df = build_dataframe(SAMPLE_SECTIONS, SAMPLE_ROLES)
+    one_pager = OnePager.from_sections(SAMPLE_SECTIONS, SAMPLE_ROLES)
+    df_json = df.to_json(orient="records", force_ascii=False)
+    one_pager_json = one_pager.to_json()
+
+    import pandas as pd
+
+    results = {
+        "build": (
+            per_call(lambda: build_dataframe(SAMPLE_SECTIONS, SAMPLE_ROLES), args.repeat),
+            per_call(lambda: OnePager.from_sections(SAMPLE_SECTIONS, SAMPLE_ROLES), args.repeat),
+        ),
+        "json round trip": (
+            per_call(lambda: pd.DataFrame(json.loads(df.to_json(orient="records", force_ascii=False))), args.repeat),
+            per_call(lambda: OnePager.from_json(one_pager.to_json()), args.repeat),
+        ),
+        "template lookups": (
+            per_call(lambda: [dataframe_lookup(df, name) for name in LOOKUPS], args.repeat // 10),
+            per_call(lambda: [one_pager.get(name) for name in LOOKUPS], args.repeat),
+        ),
+    }
+    for name, (df_seconds, model_seconds) in results.items():
+        print(f"🔹 {name:<17} DataFrame {df_seconds * 1e6:8.1f} µs   OnePager {model_seconds * 1e6:6.1f} µs   "
+              f"({df_seconds / model_seconds:.0f}x)")
+
+    df_bytes = memory_per_object(lambda i: build_dataframe({**SAMPLE_SECTIONS, "NAME": f"Candidate {i}"}, SAMPLE_ROLES),
+                                 args.one_pagers)
+    model_bytes = memory_per_object(lambda i: OnePager.from_sections({**SAMPLE_SECTIONS, "NAME": f"Candidate {i}"},
+                                                                     SAMPLE_ROLES), args.one_pagers)
+    print(f"🔹 memory per one-pager: DataFrame {df_bytes / 1024:.1f} KB, OnePager {model_bytes / 1024:.1f} KB "
+          f"(object overhead, texts are shared); JSON {len(df_json)} vs {len(one_pager_json)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: serial vs page-parallel extract_text_from_pdf.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_pdf_extraction --workers 4 --pages 20 80 200
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.synthetic_pdf import make_synthetic_cv_pdf
+from cv_process_sort_gen import extract_text_from_pdf
+
+
+def _time_it(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_file(path, workers, repeat):
+    serial_s, serial_text = _time_it(lambda: extract_text_from_pdf(path), repeat)
+    parallel_s, parallel_text = _time_it(lambda: extract_text_from_pdf(path, workers=workers), repeat)
+    budget_s, budget_text = _time_it(lambda: extract_text_from_pdf(path, workers=workers, max_chars=12000), repeat)
+    return {
+        "file": os.path.basename(path),
+        "serial_s": round(serial_s, 4),
+        "parallel_s": round(parallel_s, 4),
+        "speedup": round(serial_s / parallel_s, 2) if parallel_s else None,
+        "budget_12k_chars_s": round(budget_s, 4),
+        "budget_chars": len(budget_text),
+        "identical": serial_text == parallel_text,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pages", type=int, nargs="*", default=[20, 80, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = ["data/input/candidate_cv.pdf"]
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_pages in args.pages:
+            paths.append(make_synthetic_cv_pdf(os.path.join(tmp, f"synthetic_{n_pages}p.pdf"), n_pages, seed=n_pages))
+        for path in paths:
+            row = bench_file(path, args.workers, args.repeat)
+            print(
+                f"{row['file']:<24} serial {row['serial_s']:>8.3f}s  parallel({args.workers}) {row['parallel_s']:>8.3f}s  "
+                f"x{row['speedup']:<5} budget {row['budget_12k_chars_s']:>7.3f}s  identical={row['identical']}"
+            )
+    print(f"peak RSS (parent): {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
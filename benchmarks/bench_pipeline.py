@@ -0,0 +1,169 @@
+"""
+End-to-end offline benchmark: generate_one_pager -> render_pptx against the local mock API.
+
+Reports a per-stage latency breakdown (the stages recorded in each run's RunRecord, so it
+follows the real orchestration: extract, compact, flavor, sections, roles, intermediate file,
+store, render), throughput at several concurrency levels and peak memory, for
+data/input/candidate_cv.pdf and synthetic CVs of increasing size. --mode picks the generation
+path (concurrent, sequential, single_call or stream, as in the UI). Results can be written as
+JSON so runs on different commits can be compared.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_pipeline --latency 0.5 --jitter 0.1 --output bench_pipeline.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.memory import peak_rss_mb
+from benchmarks.mock_openai_server import start_mock_server
+from benchmarks.synthetic_pdf import make_synthetic_cv_pdf
+from one_pager_io import EXTENSIONS
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def run_stages(cv, pdf_path, flavor, tower, output_format="jsonl", mode="concurrent"):
+    """
+    One generate_one_pager (generate_one_pager_stream for mode="stream") -> render_pptx pass.
+    Returns {stage: seconds} from the run's RunRecord plus "total" (wall time); sections and roles
+    overlap in time unless mode="sequential".
+    """
+    from instrumentation import track_run
+    from populate_pptx import render_pptx
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, f"one_pager{EXTENSIONS[output_format]}") if output_format else None
+        start = time.perf_counter()
+        with track_run(file=os.path.basename(pdf_path), source="bench") as run:
+            if mode == "stream":
+                # Like the UI: the streamed one-pager is not written to an intermediate file
+                for event in cv.generate_one_pager_stream(pdf_path, flavor, tower):
+                    if event[0] == "done":
+                        one_pager = event[1]
+            else:
+                one_pager = cv.generate_one_pager(pdf_path, flavor, tower, output_path=output_path,
+                                                  concurrent=mode != "sequential", single_call=mode == "single_call",
+                                                  output_format=output_format)
+            render_pptx(one_pager).getvalue()
+        elapsed = time.perf_counter() - start
+
+    timings = dict(run.stages)
+    timings["total"] = elapsed
+    return timings
+
+
+def summarize(samples):
+    return {
+        "mean": round(statistics.mean(samples), 4),
+        "p50": round(statistics.median(samples), 4),
+        "max": round(max(samples), 4),
+    }
+
+
+def bench_stages(cv, pdf_path, flavor, tower, repeat, output_format, mode):
+    runs = [run_stages(cv, pdf_path, flavor, tower, output_format, mode) for _ in range(repeat)]
+    stages = list(dict.fromkeys(stage for run in runs for stage in run))
+    return {stage: summarize([run[stage] for run in runs if stage in run]) for stage in stages}
+
+
+def bench_memory(cv, pdf_path, flavor, tower, output_format, mode):
+    tracemalloc.start()
+    run_stages(cv, pdf_path, flavor, tower, output_format, mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2)
+
+
+def bench_concurrency(cv, pdf_path, flavor, tower, concurrency, n_cvs, output_format, mode):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: run_stages(cv, pdf_path, flavor, tower, output_format, mode), range(n_cvs)))
+    elapsed = time.perf_counter() - start
+    return {"concurrency": concurrency, "cvs": n_cvs, "elapsed_s": round(elapsed, 3),
+            "cvs_per_minute": round(n_cvs / elapsed * 60, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pages", type=int, nargs="*", default=[2, 5, 10, 20], help="Synthetic CV sizes")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 4, 8])
+    parser.add_argument("--cvs", type=int, default=16, help="CVs per concurrency level")
+    parser.add_argument("--flavor", default=None, help="Include the add_flavor stage (e.g. DA)")
+    parser.add_argument("--tower", default="Control_Tower")
+    parser.add_argument("--format", default="jsonl", choices=["jsonl", "parquet", "excel", "none"],
+                        help="Intermediate one-pager file written in each pass")
+    parser.add_argument("--mode", default="concurrent", choices=["concurrent", "sequential", "single_call", "stream"],
+                        help="Generation path of generate_one_pager (stream: generate_one_pager_stream)")
+    parser.add_argument("--output", help="Optional JSON file with the results")
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=args.latency, jitter=args.jitter)
+    store_dir = tempfile.TemporaryDirectory()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "mock"
+    os.environ["LLM_CACHE_DISABLED"] = "1"  # every run must reach the (mock) model
+    # The one-pager store is part of the run, but not the developer's own .cache/one_pagers.sqlite
+    os.environ["ONE_PAGER_STORE_PATH"] = os.path.join(store_dir.name, "one_pagers.sqlite")
+    output_format = None if args.format == "none" else args.format
+
+    import cv_process_sort_gen as cv
+
+    results = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": vars(args),
+        "inputs": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = [("candidate_cv.pdf", "data/input/candidate_cv.pdf")]
+        for n_pages in args.pages:
+            path = make_synthetic_cv_pdf(os.path.join(tmp, f"synthetic_{n_pages}p.pdf"), n_pages, seed=n_pages)
+            inputs.append((f"synthetic_{n_pages}p", path))
+
+        for name, path in inputs:
+            print(f"🔹 {name}")
+            entry = {
+                "input": name,
+                "stages": bench_stages(cv, path, args.flavor, args.tower, args.repeat, output_format, args.mode),
+                "tracemalloc_peak_mb": bench_memory(cv, path, args.flavor, args.tower, output_format, args.mode),
+            }
+            for stage, stats in entry["stages"].items():
+                print(f"   {stage:<15} mean {stats['mean']:.3f}s  p50 {stats['p50']:.3f}s  max {stats['max']:.3f}s")
+            results["inputs"].append(entry)
+
+        results["concurrency"] = []
+        for concurrency in args.concurrency:
+            row = bench_concurrency(cv, "data/input/candidate_cv.pdf", args.flavor, args.tower, concurrency, args.cvs,
+                                    output_format, args.mode)
+            print(f"🔹 concurrency {concurrency:>2}: {row['cvs_per_minute']:.1f} CVs/minute")
+            results["concurrency"].append(row)
+
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    results["mock_requests"] = server.requests
+    server.shutdown()
+    store_dir.cleanup()
+
+    print(f"🔹 Peak RSS {results['peak_rss_mb']} MB")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: speculative prefetch on upload (prefetch.py) against the local mock API.
+
+The app's flow is replayed without Streamlit: the CV is "uploaded", the user thinks for
+--think seconds (choosing tower and flavor), then clicks Generate and the job queue runs the
+one-pager. For each scenario it reports the time from Generate to the finished one-pager, and
+the LLM requests / completion tokens the whole scenario cost:
+- no prefetch (before this change);
+- prefetch, final choices match (Control_Tower, no flavor): sections are reused;
+- prefetch, a flavor is chosen: the speculative answer is not used (the call is cancelled if still
+  running), the extracted text is;
+- abandoned upload: the CV is removed --cancel-after seconds after the upload, no Generate.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_prefetch --latency 2.0 --think 10 --output bench_prefetch.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.mock_openai_server import start_mock_server
+from benchmarks.synthetic_pdf import make_synthetic_cv_pdf
+
+TOWER = "Control_Tower"
+
+
+def wait_job(job_queue, job_id):
+    while job_queue.get(job_id)["status"] not in ("done", "failed"):
+        time.sleep(0.02)
+    return job_queue.get(job_id)
+
+
+def run_scenario(name, pdf_bytes, server, job_queue, prefetcher, think, flavor=None, abandon_after=None):
+    from pipeline_stages import stage_memo
+
+    stage_memo.clear()
+    requests, tokens = server.requests, server.completion_tokens_sent
+    key = prefetcher.start(pdf_bytes, f"{name}.pdf") if prefetcher is not None else None
+
+    if abandon_after is not None:
+        time.sleep(abandon_after)
+        prefetcher.cancel(key)
+        # Let the cancelled call wind down before counting
+        while prefetcher.status(key) in ("pending", "running"):
+            time.sleep(0.02)
+        time_to_result, job = None, None
+    else:
+        time.sleep(think)
+        start = time.perf_counter()
+        if key is not None:
+            prefetcher.claim(key, tower=TOWER, flavor=flavor)
+        job = wait_job(job_queue, job_queue.submit(pdf_bytes, f"{name}.pdf", tower=TOWER, flavor=flavor))
+        time_to_result = time.perf_counter() - start
+        if key is not None:
+            while prefetcher.status(key) in ("pending", "running"):
+                time.sleep(0.02)
+
+    result = {
+        "time_to_result_s": None if time_to_result is None else round(time_to_result, 3),
+        "llm_requests": server.requests - requests,
+        "completion_tokens": server.completion_tokens_sent - tokens,
+        "prefetch": prefetcher.status(key) if key is not None else None,
+        "reused": (job["metrics"]["metadata"].get("reused_stages") or []) if job else [],
+        "status": job["status"] if job else None,
+    }
+    shown = "-" if time_to_result is None else f"{time_to_result:5.2f}s"
+    print(f"🔹 {name:<24} Generate -> result {shown:>7}   LLM requests {result['llm_requests']}   "
+          f"completion tokens {result['completion_tokens']:5d}   prefetch: {result['prefetch'] or '-'}   "
+          f"reused: {', '.join(result['reused']) or '-'}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=2.0, help="Seconds per mock completion")
+    parser.add_argument("--think", type=float, default=10.0, help="Seconds between upload and Generate")
+    parser.add_argument("--cancel-after", type=float, default=1.5,
+                        help="Seconds before the abandoned upload is removed")
+    parser.add_argument("--pages", type=int, default=2, help="Pages of the synthetic CVs")
+    parser.add_argument("--output", help="Optional JSON file with the results")
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=args.latency, jitter=0.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(
+            OPENAI_BASE_URL=server.base_url, OPENAI_API_KEY="mock", LLM_CACHE_DISABLED="1",
+            ONE_PAGER_STORE_DISABLED="1", ONE_PAGER_JOBS_PATH=os.path.join(tmp, "jobs.sqlite"),
+        )
+        from job_queue import JobQueue
+        from prefetch import Prefetcher
+
+        job_queue = JobQueue(path=os.path.join(tmp, "jobs.sqlite"), workers=1)
+        prefetcher = Prefetcher(tokens_per_minute=0, enabled=True)
+
+        # A different CV per scenario, so nothing is shared through the stage memo or the store
+        pdfs = []
+        for seed in range(4):
+            path = os.path.join(tmp, f"cv_{seed}.pdf")
+            make_synthetic_cv_pdf(path, n_pages=args.pages, seed=seed)
+            with open(path, "rb") as f:
+                pdfs.append(f.read())
+
+        results = {
+            "latency": args.latency, "think": args.think,
+            "no_prefetch": run_scenario("no prefetch", pdfs[0], server, job_queue, None, args.think),
+            "match": run_scenario("prefetch, same choices", pdfs[1], server, job_queue, prefetcher, args.think),
+            "flavor": run_scenario("prefetch, flavor chosen", pdfs[2], server, job_queue, prefetcher, args.think,
+                                   flavor="DA"),
+            "abandoned": run_scenario("prefetch, abandoned", pdfs[3], server, job_queue, prefetcher, args.think,
+                                      abandon_after=args.cancel_after),
+        }
+    server.shutdown()
+
+    baseline, match = results["no_prefetch"]["time_to_result_s"], results["match"]["time_to_result_s"]
+    print(f"🎯 Generate -> result with matching choices: {baseline:.2f}s -> {match:.2f}s "
+          f"({1 - match / baseline:.0%} less waiting)")
+    print(f"💰 Abandoned upload cost {results['abandoned']['completion_tokens']} completion tokens "
+          f"(a whole one-pager: {results['no_prefetch']['completion_tokens']})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
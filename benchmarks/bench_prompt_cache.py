@@ -0,0 +1,122 @@
+"""
+Benchmark: provider-side prompt caching of consecutive CVs with the same tower / flavor.
+
+Runs --cvs synthetic CVs back-to-back through generate_one_pager against the local mock API,
+which simulates the prefix cache of the real one (1024-token minimum, 128-token steps), and
+reports per stage the share of prompt tokens served from the cache as recorded in each run
+(usage.prompt_tokens_details.cached_tokens), with the estimated cost against no caching.
+
+The previous layout (the whole prompt as one user message) is replayed through the same
+simulated cache for comparison.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_prompt_cache --cvs 20 --tower Control_Tower --flavor DA
+"""
+import argparse
+import json
+import os
+import tempfile
+from collections import defaultdict
+from dataclasses import replace
+
+from benchmarks.mock_openai_server import PrefixCache, prefix_text, start_mock_server
+from benchmarks.synthetic_pdf import make_synthetic_cv_pdf
+
+
+def legacy_prompts(cv, cv_text, tower, flavor):
+    """{stage: prompt} as the pipeline wrote them before the system / CV split (one user message each)."""
+    from resources import read_prompt_file
+
+    prompts = {}
+    if flavor is not None:
+        prompts["flavor"] = f""" You are an AI assistant that modifies a candidate’s CV to better align with a specific role.
+    Use the following role description to guide your modifications:
+    {read_prompt_file(f"roles/{flavor}.md")}
+
+    Using the specifications provided, adapt the following candidate CV:
+    {cv_text}
+    """
+    prompts["sections"] = f""" Generate one structured section (no bullets, bold keywords).
+        Using this {read_prompt_file(cv.tower_prompt_path(tower))}
+
+        Candidate CV: {cv_text}
+        """
+    prompts["roles"] = f"""{cv.ROLES_INSTRUCTIONS}    Candidate CV:
+    {cv_text}
+    """
+    return prompts
+
+
+def summarize(per_stage):
+    rows = {}
+    for stage_name, (prompt_tokens, cached_tokens) in per_stage.items():
+        rows[stage_name] = {
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "cached_share": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cvs", type=int, default=20, help="CVs processed back-to-back")
+    parser.add_argument("--tower", default="Control_Tower")
+    parser.add_argument("--flavor", default=None, help="Optional flavor (DA, DE, DS, SE)")
+    parser.add_argument("--pages", type=int, default=2, help="Pages of each synthetic CV")
+    parser.add_argument("--output", help="Optional JSON file with the results")
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=0.05, jitter=0.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(OPENAI_BASE_URL=server.base_url, OPENAI_API_KEY="mock", LLM_CACHE_DISABLED="1",
+                          ONE_PAGER_STORE_DISABLED="1")
+        import cv_process_sort_gen as cv
+        from instrumentation import track_run
+
+        runs, texts = [], []
+        for seed in range(args.cvs):
+            path = os.path.join(tmp, f"cv_{seed}.pdf")
+            make_synthetic_cv_pdf(path, n_pages=args.pages, seed=seed)
+            cv_text = cv.prepare_cv_text(path)
+            texts.append(cv_text)
+            with track_run(file=path) as run:
+                cv.generate_one_pager(path, args.flavor, args.tower, cv_text=cv_text)
+            runs.append(run)
+    server.shutdown()
+
+    # As recorded by the runs (usage of every call)
+    current = defaultdict(lambda: [0, 0])
+    cost, cost_uncached = 0.0, 0.0
+    for run in runs:
+        for call in run.llm_calls:
+            current[call.stage][0] += call.prompt_tokens
+            current[call.stage][1] += call.cached_tokens
+            cost += call.cost_usd
+            cost_uncached += replace(call, cached_tokens=0).cost_usd
+
+    # Former layout through the same simulated cache
+    legacy_cache, legacy = PrefixCache(), defaultdict(lambda: [0, 0])
+    for cv_text in texts:
+        for stage_name, prompt in legacy_prompts(cv, cv_text, args.tower, args.flavor).items():
+            text = prefix_text([{"role": "user", "content": prompt}])
+            legacy[stage_name][0] += len(text) // 4
+            legacy[stage_name][1] += legacy_cache.lookup(text)
+
+    results = {"cvs": args.cvs, "tower": args.tower, "flavor": args.flavor,
+               "system_prefix": summarize(current), "single_user_message": summarize(legacy),
+               "cost_usd": round(cost, 6), "cost_usd_without_cache": round(cost_uncached, 6)}
+    for stage_name, row in results["system_prefix"].items():
+        before = results["single_user_message"].get(stage_name, {}).get("cached_share", 0.0)
+        print(f"🔹 {stage_name:<9} cached {row['cached_tokens']:6d} / {row['prompt_tokens']:6d} prompt tokens "
+              f"({row['cached_share']:.0%}; single user message: {before:.0%})")
+    print(f"💰 Estimated cost of {args.cvs} CVs: ${cost:.4f} (${cost_uncached:.4f} without prompt caching)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: PPTX rendering throughput (decks per second).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_render --decks 30
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fixtures import sample_one_pager
+from populate_pptx import _template_cache, populate_pptx, render_pptx
+
+
+def bench_cold_template(one_pager, decks, output_path):
+    """Baseline: the template is parsed from disk again on every render."""
+    start = time.perf_counter()
+    for _ in range(decks):
+        _template_cache.clear()
+        populate_pptx(one_pager, output_path=output_path)
+    return time.perf_counter() - start
+
+
+def bench_populate(one_pager, decks, output_path):
+    populate_pptx(one_pager, output_path=output_path)  # warm-up: parses and indexes the template
+    start = time.perf_counter()
+    for _ in range(decks):
+        populate_pptx(one_pager, output_path=output_path)
+    return time.perf_counter() - start
+
+
+def bench_render_in_memory(one_pager, decks):
+    start = time.perf_counter()
+    for _ in range(decks):
+        render_pptx(one_pager).getvalue()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--decks", type=int, default=30)
+    args = parser.parse_args()
+
+    one_pager = sample_one_pager()
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "deck.pptx")
+        cold = bench_cold_template(one_pager, args.decks, output_path)
+        warm = bench_populate(one_pager, args.decks, output_path)
+    in_memory = bench_render_in_memory(one_pager, args.decks)
+
+    print(f"populate_pptx (cold parse) : {args.decks / cold:6.2f} decks/s ({cold / args.decks * 1000:.1f} ms/deck)")
+    print(f"populate_pptx (preloaded)  : {args.decks / warm:6.2f} decks/s ({warm / args.decks * 1000:.1f} ms/deck)")
+    print(f"render_pptx (in memory)    : {args.decks / in_memory:6.2f} decks/s ({in_memory / args.decks * 1000:.1f} ms/deck)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: cold start of the app (what a new container pays before its first page load).
+
+Every measurement runs in a fresh interpreter:
+- import time of the app's modules, one at a time;
+- time to first render of streamlit_app.py (landing page, no CV uploaded) through Streamlit's
+  AppTest, and which heavy libraries (PDF, LLM, PPTX, dataframe stack) were loaded by then.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_startup --repeat 5 --output bench_startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+MODULES = ["cv_process_sort_gen", "populate_pptx", "pipeline_stages", "job_queue", "one_pager_store", "main"]
+# Not needed to show the landing page
+HEAVY_MODULES = ["pdfplumber", "openai", "pptx", "pandas", "numpy", "PIL", "pyarrow"]
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_RENDER_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("streamlit_app.py", default_timeout=120)
+loaded = time.perf_counter()
+app.run()
+done = time.perf_counter()
+print(json.dumps({{"seconds": done - start, "script_seconds": done - loaded,
+                  "exception": [str(e.value) for e in app.exception],
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_fresh(code, env):
+    """Runs code in a new interpreter from the repo root; returns the JSON it printed last."""
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--output", help="Optional JSON file with the results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Job queue / store files of the app go to a scratch directory; no LLM call is made
+        env = dict(os.environ, ONE_PAGER_JOBS_PATH=os.path.join(tmp, "jobs.sqlite"),
+                   ONE_PAGER_STORE_PATH=os.path.join(tmp, "one_pagers.sqlite"))
+        results = {"imports": {}, "first_render": None}
+
+        for module in MODULES:
+            runs = [run_fresh(_IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES), env)
+                    for _ in range(args.repeat)]
+            seconds = statistics.median(run["seconds"] for run in runs)
+            results["imports"][module] = {"seconds": seconds, "heavy": runs[-1]["heavy"]}
+            print(f"🔹 import {module:<20} {seconds * 1000:7.0f} ms   loads: {', '.join(runs[-1]['heavy']) or '-'}")
+
+        runs = [run_fresh(_RENDER_SNIPPET.format(heavy=HEAVY_MODULES), env) for _ in range(args.repeat)]
+        if runs[-1]["exception"]:
+            print(f"❌ streamlit_app.py raised: {runs[-1]['exception']}")
+        first_render = {
+            "seconds": statistics.median(run["seconds"] for run in runs),
+            "script_seconds": statistics.median(run["script_seconds"] for run in runs),
+            "heavy": runs[-1]["heavy"],
+        }
+        results["first_render"] = first_render
+        print(f"🎯 first render of the landing page: {first_render['seconds'] * 1000:.0f} ms "
+              f"(streamlit + script run), script alone {first_render['script_seconds'] * 1000:.0f} ms")
+        print(f"   heavy libraries loaded by then: {', '.join(first_render['heavy']) or 'none'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
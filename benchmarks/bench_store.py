@@ -0,0 +1,103 @@
+"""
+Benchmark: full-text search over the one-pager store with tens of thousands of one-pagers.
+
+Fills a temporary store with synthetic one-pagers (the section names of the fixtures filled with
+words drawn from a Zipf-like vocabulary) and times store.search for common terms, rare terms,
+multi-word and prefix queries, with and without a tower filter, plus the re-render of a stored
+one-pager (no LLM involved).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_store --one-pagers 50000 --queries 200
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.fixtures import SAMPLE_ROLES, SAMPLE_SECTIONS
+from benchmarks.synthetic_pdf import _WORDS
+from one_pager import OnePager
+from one_pager_store import OnePagerStore
+
+TOWERS = ["CONTROL TOWER", "DATA & AI", "CLOUD", "SECURITY", "FINANCE"]
+# Zipf-like vocabulary: the synthetic CV words are the head (in most one-pagers), then a long tail
+# of technologies / companies that only a handful of one-pagers mention
+VOCABULARY = list(dict.fromkeys(w.lower() for w in _WORDS)) + [f"tool{i:04d}" for i in range(5000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+RARE_TERMS = VOCABULARY[-4000:]
+
+
+def synthetic_rows(i, rng):
+    """A one-pager with the fixture's section and role names filled with random vocabulary."""
+
+    def line(words=10):
+        chosen = rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words)
+        return " ".join(f"**{w}**" if rng.random() < 0.3 else w for w in chosen).capitalize()
+
+    sections = {name: "\n".join(line() for _ in range(2)) for name in SAMPLE_SECTIONS}
+    sections["NAME"] = f"Candidate {i} {rng.choice(['Alvarez', 'Smith', 'Rossi', 'Dubois', 'Müller', 'García'])}"
+    rows = list(sections.items())
+    rows += [(f"Role_{n + 1}", "\n".join(line() for _ in range(4))) for n in range(len(SAMPLE_ROLES))]
+    return rows
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--one-pagers", type=int, default=50000, help="One-pagers stored")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per kind")
+    parser.add_argument("--limit", type=int, default=20, help="Results per search (page size)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OnePagerStore(os.path.join(tmp, "one_pagers.sqlite"))
+
+        start = time.perf_counter()
+        batch = 5000
+        for first in range(0, args.one_pagers, batch):
+            store.save_many(
+                (OnePager.from_rows(synthetic_rows(i, rng)), rng.choice(TOWERS), None, f"cv-{i}.pdf")
+                for i in range(first, min(first + batch, args.one_pagers))
+            )
+        elapsed = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)) / 1e6
+        print(f"🔹 stored {len(store)} one-pagers in {elapsed:.1f}s ({size_mb:.0f} MB on disk)")
+
+        kinds = {
+            "term in ~all": lambda: (rng.choice(VOCABULARY[:10]), None),
+            "mid term": lambda: (rng.choice(VOCABULARY[100:1000]), None),
+            "rare term": lambda: (rng.choice(RARE_TERMS), None),
+            "two terms": lambda: (" ".join(rng.sample(VOCABULARY[:1000], 2)), None),
+            "last word prefix": lambda: ("sql " + rng.choice(VOCABULARY[100:1000])[:-1], None),
+            "name": lambda: (f"candidate {rng.randrange(args.one_pagers)}", None),
+            "term + tower": lambda: (rng.choice(VOCABULARY[100:1000]), rng.choice(TOWERS)),
+            "browse (no text)": lambda: ("", rng.choice(TOWERS)),
+        }
+        for kind, make_query in kinds.items():
+            latencies, hits = [], []
+            for _ in range(args.queries):
+                text, tower = make_query()
+                start = time.perf_counter()
+                results = store.search(text, tower=tower, limit=args.limit)
+                latencies.append(time.perf_counter() - start)
+                hits.append(len(results))
+            print(f"🔹 {kind:<17} p50 {percentile(latencies, 0.5) * 1000:6.2f} ms  "
+                  f"p99 {percentile(latencies, 0.99) * 1000:6.2f} ms  "
+                  f"mean {statistics.mean(latencies) * 1000:6.2f} ms  ({statistics.mean(hits):.1f} results)")
+
+        start = time.perf_counter()
+        pptx_bytes = store.render(store.search(VOCABULARY[0], limit=1)[0]["id"])
+        print(f"✅ re-rendered a stored one-pager in {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({len(pptx_bytes) / 1e6:.1f} MB, no LLM call)")
+
+
+if __name__ == "__main__":
+    main()
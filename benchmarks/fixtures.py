@@ -0,0 +1,46 @@
+"""Canned, schema-valid one-pager content shared by the benchmarks."""
+
+SAMPLE_SECTIONS = {
+    "NAME": "Valeria Alvarez",
+    "TOWER": "CONTROL TOWER",
+    "PROFILE OVERVIEW": (
+        "Functional analyst with **5+ years** supporting **SAP (MM, FI, PM)**, focused on **process automation**, "
+        "**SQL** data analysis and **Power BI** reporting to improve operational efficiency."
+    ),
+    "PROFESSIONAL EDUCATION": "Industrial Engineer\nMaster in Business Analytics",
+    "INDUSTRY EXPERIENCE": "Consumer Goods and Services\nRetail\nIndustrial",
+    "FUNCTIONAL EXPERIENCE": "SAP Functional Analyst\nData Analyst\nProcurement Process Support",
+    "CERTIFICATIONS/TRAINING": "SAP S/4HANA MM\nPython\nMicrosoft Power BI",
+    "LANGUAGES": "Spanish Native\nEnglish C1",
+}
+
+SAMPLE_ROLES = [
+    "SAP Functional Analyst\n"
+    "Led **SAP MM** and **FI** enhancement projects, translating business needs into **functional specifications**.\n"
+    "Automated **month-end reconciliation** using **SQL** queries and **Python** scripts, reducing manual effort.\n"
+    "Coordinated **UAT** with cross-functional teams to deliver **process improvements** on time.",
+    "Data Analyst\n"
+    "Designed **Power BI dashboards** tracking **procurement KPIs** for regional management.\n"
+    "Cleaned and merged **ERP datasets** with **SQL** to enable self-service **reporting**.\n"
+    "Presented **data-driven insights** that supported **inventory optimization** decisions.",
+    "Business Process Analyst\n"
+    "Mapped **procure-to-pay** processes and identified **automation** opportunities.\n"
+    "Documented **master data** standards improving **data quality** across plants.\n"
+    "Trained key users on **SAP PM** workflows and **maintenance planning**.",
+]
+
+
+def sample_rows(candidate=0):
+    """(section_name, output) rows for one candidate; `candidate` varies the name."""
+    sections = dict(SAMPLE_SECTIONS)
+    if candidate:
+        sections["NAME"] = f"{sections['NAME']} {candidate}"
+    rows = list(sections.items())
+    rows += [(f"Role_{i + 1}", role) for i, role in enumerate(SAMPLE_ROLES)]
+    return rows
+
+
+def sample_one_pager(candidate=0):
+    from one_pager import OnePager
+
+    return OnePager.from_rows(sample_rows(candidate))
@@ -0,0 +1,232 @@
+"""
+Local stand-in for the OpenAI Chat Completions API, for offline benchmarks.
+
+Returns canned, schema-valid answers for each call of the pipeline (flavor, SECTIONS, ROLES and
+the single structured call), with configurable latency and jitter, streaming included.
+error_rate > 0 answers that share of the requests with a 429 (Retry-After: 1) to exercise retries.
+Prompt caching is simulated like the real API: prompts of 1024+ tokens report as
+`cached_tokens` the longest prefix (in 128-token steps) already seen in an earlier request.
+Streams closed early by the client are counted in `.disconnects`, and every answer chunk actually
+sent in `.completion_tokens_sent` (what a cancelled call was billed for).
+
+Standalone usage (from the repo root):
+    python -m benchmarks.mock_openai_server --port 8765 --latency 1.5 --jitter 0.3
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock streamlit run streamlit_app.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import SAMPLE_ROLES, SAMPLE_SECTIONS
+
+
+def _prompt_text(body):
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+def canned_answer(body):
+    """Picks the answer the real model would give for this call of the pipeline."""
+    prompt = _prompt_text(body)
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return json.dumps({
+            "sections": [{"name": name, "content": content} for name, content in SAMPLE_SECTIONS.items()],
+            "roles": [{"title": role.split("\n")[0], "lines": role.split("\n")[1:]} for role in SAMPLE_ROLES],
+        })
+    if "RELEVANT EXPERIENCE" in prompt:
+        return "\n\n".join(SAMPLE_ROLES)
+    if "modifies a candidate" in prompt:
+        # Flavored CV: roughly the same size as the CV that was sent
+        cv = re.split("candidate CV:", prompt, flags=re.IGNORECASE)[-1]
+        return "Adapted CV\n" + cv.strip()
+    return json.dumps(SAMPLE_SECTIONS, ensure_ascii=False)
+
+
+def _estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+# Prompt caching of the real API: 1024-token minimum, then 128-token increments (~4 chars per token)
+CACHE_MIN_CHARS = 1024 * 4
+CACHE_STEP_CHARS = 128 * 4
+
+
+def prefix_text(messages):
+    """A request as the provider's prefix cache sees it: messages in order, roles included."""
+    return "".join(f"<{message.get('role')}>{message.get('content') or ''}" for message in messages)
+
+
+class PrefixCache:
+    """Exact-prefix prompt cache: remembers the hash of every cacheable prefix it has seen."""
+
+    def __init__(self):
+        self._prefixes = set()
+        self._lock = threading.Lock()
+
+    def lookup(self, text):
+        """Tokens of the longest already-seen prefix of `text` (0 under 1024 tokens); then caches its prefixes."""
+        boundaries = range(CACHE_MIN_CHARS, len(text) + 1, CACHE_STEP_CHARS)
+        hashes = [(end, hashlib.sha256(text[:end].encode("utf-8")).digest()) for end in boundaries]
+        with self._lock:
+            cached = max((end for end, digest in hashes if digest in self._prefixes), default=0)
+            self._prefixes.update(digest for _, digest in hashes)
+        return cached // 4
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockOpenAI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.stats_add(body)
+
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            payload = json.dumps({"error": {"message": "Rate limit reached (mock)", "type": "requests",
+                                            "code": "rate_limit_exceeded"}}).encode("utf-8")
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        answer = canned_answer(body)
+        prompt_tokens = _estimate_tokens(_prompt_text(body))
+        completion_tokens = _estimate_tokens(answer)
+        cached_tokens = min(prompt_tokens, self.server.prefix_cache.lookup(prefix_text(body.get("messages", []))))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "mock")
+
+        delay = max(0.0, self.server.latency + random.uniform(-self.server.jitter, self.server.jitter))
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            # First token after ~20% of the latency, the rest spread over the remaining time
+            time.sleep(delay * 0.2)
+            pieces = [answer[i:i + 40] for i in range(0, len(answer), 40)] or [""]
+            per_piece = delay * 0.8 / len(pieces)
+            for piece in pieces:
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                }
+                try:
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client closed the stream (cancelled call): the model stops generating
+                    self.server.stats_disconnect()
+                    self.close_connection = True
+                    return
+                self.server.stats_sent(_estimate_tokens(piece))
+                time.sleep(per_piece)
+            final = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage,
+            }
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        time.sleep(delay)
+        payload = json.dumps({
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": usage,
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.stats_sent(completion_tokens)
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=1.0, jitter=0.2, error_rate=0.0):
+        super().__init__(address, MockOpenAIHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.disconnects = 0
+        self.completion_tokens_sent = 0
+        self.prefix_cache = PrefixCache()
+        self._lock = threading.Lock()
+
+    def stats_add(self, body):
+        with self._lock:
+            self.requests += 1
+
+    def stats_disconnect(self):
+        with self._lock:
+            self.disconnects += 1
+
+    def stats_sent(self, tokens):
+        with self._lock:
+            self.completion_tokens_sent += tokens
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_mock_server(latency=1.0, jitter=0.2, host="127.0.0.1", port=0, error_rate=0.0):
+    """Starts the server in a background thread; returns it (use .base_url and .shutdown())."""
+    server = MockOpenAIServer((host, port), latency=latency, jitter=jitter, error_rate=error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.2, help="± seconds of random jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 429")
+    args = parser.parse_args()
+    server = MockOpenAIServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate)
+    print(f"Mock OpenAI API listening on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Tiny dependency-free PDF writer used by the benchmarks to build synthetic CVs."""
+import random
+
+_WORDS = (
+    "SQL Python Power BI Tableau ETL pipelines analytics stakeholders dashboards SAP MM FI "
+    "procurement supply chain automation reporting forecasting Databricks Azure AWS Spark "
+    "led designed implemented improved reduced delivered migrated optimized coordinated "
+    "data model quality governance inventory demand planning KPIs machine learning"
+).split()
+
+_SECTIONS = ["PROFILE", "EXPERIENCE", "EDUCATION", "SKILLS", "CERTIFICATIONS", "LANGUAGES", "PROJECTS"]
+
+
+def synthetic_cv_lines(n_lines, seed=0):
+    rng = random.Random(seed)
+    lines = ["Jane Synthetic Candidate", "jane.candidate@example.com  +34 600 000 000"]
+    while len(lines) < n_lines:
+        if rng.random() < 0.08:
+            lines.append(rng.choice(_SECTIONS))
+        else:
+            lines.append(" ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 14))).capitalize() + ".")
+    return lines
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """Write `pages` (a list of lists of text lines) as a simple Helvetica PDF."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        stream_lines = [b"BT /F1 10 Tf 12 TL 50 800 Td"]
+        for line in page_lines:
+            stream_lines.append(f"({_escape(line)}) Tj T*".encode("latin-1", "replace"))
+        stream_lines.append(b"ET")
+        stream = b"\n".join(stream_lines)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+    return path
+
+
+def make_synthetic_cv_pdf(path, n_pages, lines_per_page=60, seed=0, header="Jane Synthetic Candidate - Curriculum Vitae"):
+    """Synthetic CV with a repeated header and a page-number footer on every page."""
+    body = synthetic_cv_lines(n_pages * lines_per_page, seed=seed)
+    pages = []
+    for i in range(n_pages):
+        chunk = body[i * lines_per_page:(i + 1) * lines_per_page]
+        pages.append([header] + chunk + [f"Page {i + 1} of {n_pages}"])
+    return write_pdf(path, pages)
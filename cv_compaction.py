@@ -0,0 +1,205 @@
+import functools
+import math
+import os
+import re
+from dataclasses import dataclass, field
+
+# Default input budget for the CV text sent to the LLM (0 / empty = no limit)
+DEFAULT_TOKEN_BUDGET = int(os.getenv("CV_TOKEN_BUDGET", "6000") or 0) or None
+
+_WHITESPACE_RE = re.compile(r"[ \t ​]+")
+_PAGE_NUMBER_RE = re.compile(r"^(page|p[aá]gina|pag\.?)?\s*\d{1,3}(\s*(/|of|de)\s*\d{1,3})?$", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+_URL_RE = re.compile(r"(https?://\S+|www\.\S+|\S*linkedin\.com\S*|(^|\s)/in/\S+|github\.com/\S+)", re.IGNORECASE)
+# Only with a leading '+' or a tel/phone label (dropped with it): bare digit runs are dates and amounts
+_PHONE_RE = re.compile(
+    r"\b(tel[eé]fono|telf|tel|phone|mobile|m[oó]vil|cell|whatsapp)\b\.?\s*:?\s*\(?\+?\d[\d\s().-]{6,}\d"
+    r"|\(?\+\d[\d\s().-]{6,}\d",
+    re.IGNORECASE,
+)
+# Headers/footers are only looked for in the first and last lines of each page
+_EDGE_LINES = 3
+
+# Section headings (English / Spanish CVs) -> priority when the token budget forces cuts.
+# Lower number = kept first. The header before the first heading (name, title) is priority 0.
+_SECTION_PRIORITIES = [
+    (1, r"(professional\s+)?(profile|summary|about\s+me|objective)|perfil(\s+profesional)?|resumen|sobre\s+m[ií]|objetivo"),
+    (2, r"(work\s+|professional\s+)?experience|employment(\s+history)?|experiencia(\s+laboral|\s+profesional)?|trayectoria"),
+    (3, r"skills|competencies|tools|technologies|habilidades|competencias|conocimientos|herramientas"),
+    (4, r"education|academic(\s+background)?|educaci[oó]n|formaci[oó]n(\s+acad[eé]mica)?|estudios"),
+    (5, r"certifications?|certificates|courses|training|certificaciones?|certificados|cursos|capacitaci[oó]n"),
+    (6, r"languages|idiomas"),
+    (7, r"projects|proyectos"),
+    (9, r"references|referencias|hobbies|interests|intereses|volunteering|voluntariado"),
+]
+_HEADING_RES = [(priority, re.compile(rf"\b({pattern})\b", re.IGNORECASE)) for priority, pattern in _SECTION_PRIORITIES]
+
+
+@functools.lru_cache(maxsize=1)
+def _token_encoder():
+    """The tiktoken encoder, resolved once per process; None if tiktoken is missing or can't load it (offline)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except (OSError, ValueError) as e:
+        print(f"⚠️ tiktoken encoding unavailable, estimating ~4 chars/token: {e}")
+        return None
+
+
+def estimate_tokens(text):
+    """Token count with tiktoken when installed, otherwise the usual ~4 chars/token estimate."""
+    encoder = _token_encoder()
+    if encoder is None:
+        return math.ceil(len(text) / 4)
+    return len(encoder.encode(text))
+
+
+@dataclass
+class CompactionResult:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    removed_lines: int = 0
+    dropped_sections: list = field(default_factory=list)
+
+    @property
+    def saved_ratio(self):
+        return 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+
+
+def _normalize(line):
+    return _WHITESPACE_RE.sub(" ", line).strip()
+
+
+def _strip_contact(line):
+    """
+    Removes emails, phones and profile URLs; returns what is left of the line.
+
+    >>> _strip_contact("Tel: +34 600 123 456 | jane@doe.com")
+    ''
+    >>> _strip_contact("Data Analyst 2018-2020")
+    'Data Analyst 2018-2020'
+    >>> _strip_contact("Built dashboards 2019 - 2021")
+    'Built dashboards 2019 - 2021'
+    >>> _strip_contact("Managed 1 200 000 EUR budget")
+    'Managed 1 200 000 EUR budget'
+    """
+    for pattern in (_EMAIL_RE, _URL_RE, _PHONE_RE):
+        line = pattern.sub(" ", line)
+    return _normalize(line.strip(" |·•,;-"))
+
+
+def _heading_priority(line):
+    """Short lines (max 4 words) containing a section keyword, e.g. 'Technical Skills:'."""
+    if len(line) > 40 or len(line.split()) > 4:
+        return None
+    for priority, heading_re in _HEADING_RES:
+        if heading_re.search(line):
+            return priority
+    return None
+
+
+def _split_sections(lines):
+    """[(priority, heading, [lines])] in document order; the first block is the header."""
+    sections = [(0, "HEADER", [])]
+    for line in lines:
+        priority = _heading_priority(line)
+        if priority is not None:
+            sections.append((priority, line, [line]))
+        else:
+            sections[-1][2].append(line)
+    return [section for section in sections if section[2]]
+
+
+def _apply_budget(lines, token_budget):
+    """Keeps the most relevant sections that fit in token_budget, in their original order."""
+    sections = _split_sections(lines)
+    costs = [estimate_tokens("\n".join(section_lines)) for _, _, section_lines in sections]
+    keep = {}
+    remaining = token_budget
+    for index in sorted(range(len(sections)), key=lambda i: (sections[i][0], i)):
+        _, _, section_lines = sections[index]
+        if costs[index] <= remaining:
+            keep[index] = section_lines
+            remaining -= costs[index]
+        elif remaining > 0:
+            # Take the section partially, line by line, with what is left of the budget
+            partial = []
+            for line in section_lines:
+                cost = estimate_tokens(line)
+                if cost > remaining:
+                    break
+                partial.append(line)
+                remaining -= cost
+            if partial:
+                keep[index] = partial
+            # Budget used up: less relevant sections are dropped entirely
+            remaining = 0
+    dropped = [sections[i][1] for i in range(len(sections)) if i not in keep]
+    kept_lines = [line for i in sorted(keep) for line in keep[i]]
+    return kept_lines, dropped
+
+
+def compact_cv_text(pages, token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Shrinks the extracted CV before it is sent to the LLM.
+
+    pages: list of page texts (extract_pages_from_pdf) or a single string.
+    - lines repeated at the top or bottom of several pages (headers/footers) are kept only the
+      first time; lines in the body of a page are never deduplicated
+    - page numbers, emails, phone numbers and profile URLs are removed
+    - runs of spaces and blank lines are collapsed
+    - if token_budget is set, the most relevant sections are kept first (header, profile,
+      experience, skills, education...) until the budget is used up
+
+    Returns a CompactionResult with the text and the token counts before/after.
+    """
+    if isinstance(pages, str):
+        pages = [pages]
+    pages = [page or "" for page in pages]
+    original = "\n".join(page for page in pages if page).strip()
+
+    page_lines = [[line for line in map(_normalize, page.splitlines()) if line] for page in pages]
+    # Lines in the header/footer area of each page (first and last _EDGE_LINES lines)
+    page_edges = [set(lines[:_EDGE_LINES] + lines[-_EDGE_LINES:]) for lines in page_lines]
+    pages_per_line = {}
+    for edges in page_edges:
+        for line in edges:
+            pages_per_line[line] = pages_per_line.get(line, 0) + 1
+    repeat_threshold = max(2, math.ceil(len(pages) / 2))
+
+    seen_repeated = set()
+    lines_out = []
+    removed = 0
+    for lines in page_lines:
+        for position, line in enumerate(lines):
+            if _PAGE_NUMBER_RE.match(line):
+                removed += 1
+                continue
+            at_edge = position < _EDGE_LINES or position >= len(lines) - _EDGE_LINES
+            if at_edge and pages_per_line.get(line, 0) >= repeat_threshold:
+                if line in seen_repeated:
+                    removed += 1
+                    continue
+                seen_repeated.add(line)
+            stripped = _strip_contact(line)
+            if not stripped:
+                removed += 1
+                continue
+            lines_out.append(stripped)
+
+    dropped = []
+    if token_budget:
+        lines_out, dropped = _apply_budget(lines_out, token_budget)
+
+    text = "\n".join(lines_out)
+    return CompactionResult(
+        text=text,
+        tokens_before=estimate_tokens(original),
+        tokens_after=estimate_tokens(text),
+        removed_lines=removed,
+        dropped_sections=dropped,
+    )
@@ -1,25 +1,273 @@
-import pdfplumber
-import pandas as pd
+import hashlib
 import io
 import json
-from openai import OpenAI
 import os
-from dotenv import load_dotenv
+import queue
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from llm_cache import response_cache, make_cache_key
+from resources import get_openai_client, read_prompt_file
+from section_stream import IncrementalSectionParser, RoleBlockSplitter
+from cv_compaction import DEFAULT_TOKEN_BUDGET, compact_cv_text, estimate_tokens
+from llm_scheduler import llm_scheduler
+from one_pager import OnePager
+from one_pager_io import detect_format, save_one_pager
+from one_pager_store import get_one_pager_store
+from instrumentation import (current_run, record_llm_call, record_memory, record_retry, stage, submit_in_context,
+                             track_run)
+from ingest_guard import MAX_PDF_PAGES, MAX_TEXT_CHARS, check_pdf
+import time
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key = api_key)
+# pdfplumber and the OpenAI SDK are imported where they are used: the app's landing page
+# imports this module through the job queue only when a CV is generated. .env is loaded by the
+# entry points (streamlit_app.py, main.py) and again by get_openai_client.
+
+MODEL = "gpt-5-mini"
+# Expected answer size, reserved in the tokens-per-minute budget until the real usage is known
+COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "1500"))
+
+def cv_messages(instructions, cv_text):
+    """
+    Messages of an LLM call on a CV: the static instructions as the system message, the CV last.
+    The provider's prompt cache only matches byte-identical prefixes, so nothing CV-specific
+    goes in the system message: it is the same for every CV with the same tower / flavor.
+    """
+    return [
+        {"role": "system", "content": instructions},
+        {"role": "user", "content": f"Candidate CV:\n{cv_text}", "reasoning-effort": "medium"},
+    ]
+
+def _as_messages(prompt):
+    """A prompt string is sent as a single user message."""
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt, "reasoning-effort": "medium"}]
+    return prompt
+
+def _request_options(messages):
+    """prompt_cache_key: requests sharing a system message are routed to the same prompt cache."""
+    if messages[0]["role"] != "system":
+        return {}
+    prefix_hash = hashlib.sha256(messages[0]["content"].encode("utf-8")).hexdigest()
+    return {"prompt_cache_key": f"one-pager-{prefix_hash[:16]}"}
+
+def estimate_prompt_tokens(messages):
+    return sum(estimate_tokens(message["content"]) for message in messages)
+
+def _cacheable(text, validate=None):
+    """
+    Whether an answer may be served from / stored in response_cache: never an empty one (e.g. the
+    reasoning used up the output tokens), nor one validate(text) rejects with TypeError/ValueError,
+    so a retry asks the model again instead of getting the same bad answer for the whole TTL.
+    """
+    if not text:
+        return False
+    if validate is None:
+        return True
+    try:
+        validate(text)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+def chat_completion(prompt, prompt_files=(), response_format=None, refresh=False, validate=None):
+    """
+    Single entry point for the LLM calls. The answer is looked up in response_cache first,
+    keyed on (model, rendered prompt, contents of prompt_files), so re-running the same CV
+    with the same tower/flavor doesn't pay for the same completion twice.
+
+    prompt: list of messages (see cv_messages) or a string, sent as one user message.
+    response_format: optional structured-output spec passed to the API (part of the cache key).
+    refresh = True skips the cache lookup and overwrites the entry (used to retry a bad answer).
+    validate: optional parser of the answer; answers it rejects are neither cached nor served from the cache.
+    """
+    messages = _as_messages(prompt)
+    params = {"response_format": response_format} if response_format else None
+    key = make_cache_key(MODEL, messages, prompt_files, params=params)
+    if not refresh:
+        cached = response_cache.get(key)
+        if cached is not None and _cacheable(cached, validate):
+            record_llm_call(MODEL, 0.0, cache_hit=True)
+            return cached
+
+    extra = {"response_format": response_format} if response_format else {}
+    start = time.perf_counter()
+    response = llm_scheduler.call(
+        lambda: get_openai_client().chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            **_request_options(messages),
+            **extra,
+        ),
+        estimated_tokens=estimate_prompt_tokens(messages) + COMPLETION_TOKENS_ESTIMATE,
+    )
+    record_llm_call(MODEL, time.perf_counter() - start, usage=response.usage)
+    text = (response.choices[0].message.content or "").strip()
+    if _cacheable(text, validate):
+        response_cache.set(key, text)
+    return text
+
+def stream_completion(prompt, prompt_files=(), validate=None):
+    """
+    Streaming version of chat_completion: yields the answer chunk by chunk as the model writes it.
+    A cache hit is yielded in one piece; a complete streamed answer is stored in the cache
+    (same rules as chat_completion: not if empty or rejected by validate).
+    """
+    messages = _as_messages(prompt)
+    key = make_cache_key(MODEL, messages, prompt_files)
+    cached = response_cache.get(key)
+    if cached is not None and _cacheable(cached, validate):
+        record_llm_call(MODEL, 0.0, cache_hit=True)
+        yield cached
+        return
+
+    start = time.perf_counter()
+    stream = llm_scheduler.stream(
+        lambda: get_openai_client().chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **_request_options(messages),
+        ),
+        estimated_tokens=estimate_prompt_tokens(messages) + COMPLETION_TOKENS_ESTIMATE,
+    )
+    parts = []
+    usage = None
+    for chunk in stream:
+        # With include_usage the last chunk carries the usage and no choices
+        usage = getattr(chunk, "usage", None) or usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+    record_llm_call(MODEL, time.perf_counter() - start, usage=usage)
+    text = "".join(parts).strip()
+    if _cacheable(text, validate):
+        response_cache.set(key, text)
+
+def _read_pdf_source(pdf_path):
+    """Paths are passed as-is to the worker processes; uploaded files (file-like) as bytes."""
+    if hasattr(pdf_path, "read"):
+        if hasattr(pdf_path, "seek"):
+            pdf_path.seek(0)
+        return pdf_path.read()
+    return pdf_path
+
+def _extract_page_range(source, start, stop):
+    """Worker: extract pages [start, stop) and release each page as soon as it is read."""
+    import pdfplumber
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    texts = []
+    with pdfplumber.open(source) as pdf:
+        for page_number in range(start, stop):
+            page = pdf.pages[page_number]
+            texts.append(page.extract_text())
+            page.close()
+    return texts
+
+def _budget_reached(pages_done, chars_done, max_pages, max_chars):
+    if max_pages is not None and pages_done >= max_pages:
+        return True
+    return max_chars is not None and chars_done >= max_chars
+
+def extract_pages_from_pdf(pdf_path, workers=None, max_chars=None, max_pages=None, chunk_size=None):
+    """
+    Return the extracted text of each page, in order.
+
+    workers = None/1 reads the pages serially; workers > 1 splits the document in page chunks
+    processed by a process pool. Each page is closed right after extraction so pdfplumber does
+    not keep its parsed objects until the file is closed.
+
+    max_chars / max_pages: optional budget. Extraction stops (and pending chunks are cancelled)
+    once that many characters or pages have been collected.
+    """
+    import pdfplumber
+
+    texts = []
+    chars_done = 0
+
+    if not workers or workers <= 1:
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                page.close()
+                texts.append(page_text)
+                chars_done += len(page_text or "")
+                record_memory()
+                if _budget_reached(len(texts), chars_done, max_pages, max_chars):
+                    break
+        return texts
+
+    source = _read_pdf_source(pdf_path)
+    with pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source) as pdf:
+        n_pages = len(pdf.pages)
+    if max_pages is not None:
+        n_pages = min(n_pages, max_pages)
+    chunk_size = chunk_size or max(1, min(8, n_pages // (workers * 2) or 1))
+    chunks = [(start, min(start + chunk_size, n_pages)) for start in range(0, n_pages, chunk_size)]
+
+    # Only `workers` chunks in flight at a time, consumed in order, so a budget hit stops
+    # the remaining work instead of extracting the whole document anyway.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        next_chunk = 0
+        while next_chunk < len(chunks) and len(pending) < workers:
+            pending.append(executor.submit(_extract_page_range, source, *chunks[next_chunk]))
+            next_chunk += 1
+        while pending:
+            for page_text in pending.popleft().result():
+                texts.append(page_text)
+                chars_done += len(page_text or "")
+                if _budget_reached(len(texts), chars_done, max_pages, max_chars):
+                    for future in pending:
+                        future.cancel()
+                    return texts
+            if next_chunk < len(chunks):
+                pending.append(executor.submit(_extract_page_range, source, *chunks[next_chunk]))
+                next_chunk += 1
+    return texts
 
 # Extrae texto. Esto está ok.
-def extract_text_from_pdf(pdf_path):
-    """Extract text from all pages of the PDF."""
-    text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text.strip()
+def extract_text_from_pdf(pdf_path, workers=None, max_chars=None, max_pages=None):
+    """Extract text from all pages of the PDF.
+
+    Same output as the original page-by-page `text += ...` loop; see extract_pages_from_pdf
+    for the parallel mode (workers) and the optional max_chars / max_pages budget.
+    """
+    pages = extract_pages_from_pdf(pdf_path, workers=workers, max_chars=max_chars, max_pages=max_pages)
+    return "\n".join(page_text for page_text in pages if page_text).strip()
+
+def _warn_truncated(chars):
+    if MAX_TEXT_CHARS and chars >= MAX_TEXT_CHARS:
+        print(f"⚠️ Extraction stopped after {chars} characters (CV_MAX_CHARS={MAX_TEXT_CHARS})")
+
+def prepare_cv_text(cv_path, compact=True, token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Extraction + compaction stage: returns the CV text that is sent to the LLM.
+    compact = False returns the raw extract_text_from_pdf output.
+
+    The PDF is checked against the ingestion limits first (ingest_guard.CVRejected, before any
+    page is parsed); extraction stops at MAX_TEXT_CHARS characters.
+    """
+    with stage("extract"):
+        check_pdf(cv_path)
+        if not compact:
+            text = extract_text_from_pdf(cv_path, max_chars=MAX_TEXT_CHARS or None, max_pages=MAX_PDF_PAGES or None)
+            _warn_truncated(len(text))
+            return text
+        pages = extract_pages_from_pdf(cv_path, max_chars=MAX_TEXT_CHARS or None, max_pages=MAX_PDF_PAGES or None)
+        _warn_truncated(sum(len(page_text or "") for page_text in pages))
+    with stage("compact"):
+        result = compact_cv_text(pages, token_budget=token_budget)
+    print(f"🔹 CV compacted: {result.tokens_before} → {result.tokens_after} tokens "
+          f"({result.saved_ratio:.0%} saved, {result.removed_lines} lines removed)")
+    if result.dropped_sections:
+        print(f"   Dropped to fit the {token_budget}-token budget: {', '.join(result.dropped_sections)}")
+    return result.text
 
 # condicional, si queremos modificar el rol 
 def add_flavor(cv_txt, flavor):
@@ -30,54 +278,57 @@ def add_flavor(cv_txt, flavor):
 
     Ejemplo: flavor = DE --> Convierte un CV genérico en un CV adaptado a Data Engineer.
     """
-    with open(f"roles/{flavor}.md", "r", encoding="utf-8") as f:
-        prompt_flavor = f.read()
-    
-    prompt = f""" You are an AI assistant that modifies a candidate’s CV to better align with a specific role.
-    Use the following role description to guide your modifications:
-    {prompt_flavor}
-    
-    Using the specifications provided, adapt the following candidate CV:
-    {cv_txt}
-    """
+    role_path = f"roles/{flavor}.md"
+    prompt_flavor = read_prompt_file(role_path)
+
+    # Mismo prefijo (system) para todos los CVs de un flavor; el CV va al final
+    instructions = f"""You are an AI assistant that modifies a candidate’s CV to better align with a specific role.
+Use the following role description to guide your modifications:
+{prompt_flavor}
+
+Using the specifications provided, adapt the candidate CV sent by the user."""
 
     # modifique en función prompt 
-    response = client.chat.completions.create(
-    model="gpt-5-mini",
-    messages=[{"role": "user", "content": prompt, "reasoning-effort": "medium"}])
-    return response.choices[0].message.content.strip()
+    with stage("flavor"):
+        return chat_completion(cv_messages(instructions, cv_txt), prompt_files=[role_path])
+
+
+def tower_prompt_path(tower_selected):
+    """prompt_dictionary file for the tower; default.md (auto-detects the tower) when None."""
+    if tower_selected is None:
+        return "prompt_dictionary/default.md"
+    return f"prompt_dictionary/{tower_selected.lower()}.md"
 
+def sections_instructions(tower_selected):
+    """Static part of the SECTIONS prompt: identical for every CV of the tower."""
+    return f"""Generate one structured section (no bullets, bold keywords).
+Using this {read_prompt_file(tower_prompt_path(tower_selected))}"""
+
+def sections_prompt(cv_text, tower_selected):
+    """Returns (messages, prompt file used) for the SECTIONS call."""
+    return cv_messages(sections_instructions(tower_selected), cv_text), tower_prompt_path(tower_selected)
 
 def generate_sections(cv_text, tower_selected):
     """ Esta función toma como input el texto del CV (con o sin flavor) y llama al prompt segun la 
     torre seleccionada a fin de generar las secciones fijas del one-pager. Si el usuario no selecciona torre,
     se usa el prompt default.md, el cuál identifica la torre según el contenido del CV."""
+    prompt_completed, prompt_path = sections_prompt(cv_text, tower_selected)
+    with stage("sections"):
+        return chat_completion(prompt_completed, prompt_files=[prompt_path], validate=parse_sections_json)
 
-    if tower_selected is not None:
-        with open(f"prompt_dictionary/{tower_selected.lower()}.md", "r", encoding="utf-8") as f:
-            file = f.read()
-        prompt_completed = f""" Generate one structured section (no bullets, bold keywords). 
-        Using this {file} 
-        
-        Candidate CV: {cv_text}
-        """
-    else:
-        with open(f"prompt_dictionary/default.md", "r", encoding="utf-8") as f:
-            file = f.read()
-        prompt_completed = f""" Generate one structured section (no bullets, bold keywords). 
-        Using this {file} 
-        
-        Candidate CV: {cv_text}
-        """
-    response = client.chat.completions.create(
-        model="gpt-5-mini",
-        messages=[{"role": "user", "content": prompt_completed, "reasoning-effort": "medium"}],
-    )
-    return response.choices[0].message.content.strip()
+def stream_sections(cv_text, tower_selected):
+    """
+    Same call as generate_sections but streamed: yields (section_name, text) as soon as each
+    section of the JSON answer is complete, and finally ("__raw__", full answer text).
+    """
+    prompt_completed, prompt_path = sections_prompt(cv_text, tower_selected)
+    parser = IncrementalSectionParser()
+    with stage("sections"):
+        for chunk in stream_completion(prompt_completed, prompt_files=[prompt_path], validate=parse_sections_json):
+            yield from parser.feed(chunk)
+    yield "__raw__", parser.buffer.strip()
 
-def generate_roles(cv_text):
-    """Generate up to 4 roles, formatted with bold keywords and line breaks only."""
-    prompt = f"""
+ROLES_INSTRUCTIONS = """
     You are an AI assistant that extracts and rewrites a candidate’s RELEVANT EXPERIENCE into up to 4 roles.
 
     Formatting and style:
@@ -100,52 +351,333 @@ def generate_roles(cv_text):
     - Exclude company names, institutions, and dates.
     - Maximum of 4 roles. If fewer exist, only return those. Do NOT create new roles.
 
-    Candidate CV:
-    {cv_text}
-    """
+"""
 
-    response = client.chat.completions.create(
-        model="gpt-5-mini",
-        messages=[{"role": "user", "content": prompt, "reasoning-effort": "medium"}],
-    )
-
-    text = response.choices[0].message.content.strip()
+def roles_prompt(cv_text):
+    return cv_messages(ROLES_INSTRUCTIONS, cv_text)
 
+def split_roles(text):
     # Split each role block by double line breaks
     roles = [r.strip() for r in text.split("\n\n") if r.strip()]
     return roles[:4]
 
-def generate_one_pager(cv_path, flavor, tower_selected, output_path="one_pager_summary.xlsx"):
-    """Generate all sections and return DataFrame."""
+def generate_roles(cv_text):
+    """Generate up to 4 roles, formatted with bold keywords and line breaks only."""
+    with stage("roles"):
+        return split_roles(chat_completion(roles_prompt(cv_text)))
+
+def stream_roles(cv_text):
+    """Streamed generate_roles: yields each role block as soon as it is complete (max 4)."""
+    splitter = RoleBlockSplitter(max_roles=4)
+    with stage("roles"):
+        for chunk in stream_completion(roles_prompt(cv_text)):
+            yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+def generate_sections_and_roles(cv_text, tower_selected):
+    """Lanza generate_sections y generate_roles a la vez (ambas solo necesitan cv_text).
+
+    Returns a tuple (sections, roles) with the same values the sync functions return.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sections_future = submit_in_context(executor, generate_sections, cv_text, tower_selected)
+        roles_future = submit_in_context(executor, generate_roles, cv_text)
+        return sections_future.result(), roles_future.result()
+
+def parse_sections_json(text):
+    """
+    Parses the SECTIONS answer. Tolerates prose or ```json fences around the object instead of
+    failing like a bare json.loads would.
+    """
     try:
-        cv_text = extract_text_from_pdf(cv_path)
-        #Opcional
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    start = text.find("{")
+    if start == -1:
+        raise ValueError(f"No JSON object in SECTIONS answer: {text[:200]!r}")
+    sections, _ = json.JSONDecoder().raw_decode(text, start)
+    return sections
 
-        if flavor is not None: 
-            cv_text = add_flavor(cv_text, flavor)
-        else: 
-            pass 
+# ---------- Single structured-output call ----------
+
+ONE_PAGER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}, "content": {"type": "string"}},
+                "required": ["name", "content"],
+                "additionalProperties": False,
+            },
+        },
+        "roles": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "lines": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["title", "lines"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["sections", "roles"],
+    "additionalProperties": False,
+}
+
+ONE_PAGER_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "one_pager", "strict": True, "schema": ONE_PAGER_SCHEMA},
+}
+
+def single_call_prompt(cv_text, flavor, tower_selected):
+    """
+    Builds the one-call prompt: role guidance (if any flavor), the tower prompt and the roles
+    instructions together as the system message, followed by the original CV.
+    Returns (messages, prompt files used).
+    """
+    tower_path = tower_prompt_path(tower_selected)
+    prompt_files = [tower_path]
+    parts = ["You are an AI assistant that turns a candidate CV into a one-pager."]
+    if flavor is not None:
+        role_path = f"roles/{flavor}.md"
+        prompt_files.append(role_path)
+        parts.append(
+            "Frame every section and role towards this target role, without inventing experience:\n"
+            + read_prompt_file(role_path)
+        )
+    parts.append(
+        "SECTIONS: fill `sections` with one {name, content} item per section of these instructions "
+        "(use the section names exactly as written):\n" + read_prompt_file(tower_path)
+    )
+    parts.append(
+        "ROLES: fill `roles` with up to 4 {title, lines} items following these instructions "
+        "(each line of the role goes in `lines`):\n" + ROLES_INSTRUCTIONS
+    )
+    return cv_messages("\n\n".join(parts), cv_text), prompt_files
+
+def parse_one_pager_json(text):
+    """Validates the structured answer; returns (sections dict, roles list) or raises ValueError."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get("sections"), list) or not isinstance(data.get("roles"), list):
+        raise ValueError("Expected an object with `sections` and `roles` lists")
+
+    sections = {}
+    for item in data["sections"]:
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str) or not isinstance(item.get("content"), str):
+            raise ValueError(f"Invalid section item: {item!r}")
+        sections[item["name"].strip()] = item["content"].strip()
+    if not sections:
+        raise ValueError("No sections returned")
+
+    roles = []
+    for item in data["roles"][:4]:
+        if not isinstance(item, dict) or not isinstance(item.get("title"), str) or not isinstance(item.get("lines"), list):
+            raise ValueError(f"Invalid role item: {item!r}")
+        lines = [str(line).strip() for line in item["lines"] if str(line).strip()]
+        roles.append("\n".join([item["title"].strip()] + lines))
+    return sections, roles
+
+def generate_single_call(cv_text, flavor, tower_selected, max_attempts=3):
+    """
+    Sections and up to 4 roles in one structured-output request (replaces add_flavor +
+    generate_sections + generate_roles). An answer that fails validation is retried on its own,
+    without restarting the pipeline.
+    """
+    prompt, prompt_files = single_call_prompt(cv_text, flavor, tower_selected)
+    last_error = None
+    for attempt in range(max_attempts):
+        if attempt:
+            record_retry()
+        with stage("single_call"):
+            text = chat_completion(
+                prompt, prompt_files=prompt_files, response_format=ONE_PAGER_RESPONSE_FORMAT, refresh=attempt > 0,
+                validate=parse_one_pager_json,
+            )
+        try:
+            return parse_one_pager_json(text)
+        except ValueError as e:
+            last_error = e
+            print(f"⚠️ Invalid structured answer (attempt {attempt + 1}/{max_attempts}): {e}")
+    raise ValueError(f"Structured one-pager failed validation after {max_attempts} attempts: {last_error}")
+
+def build_one_pager(response_dic, roles):
+    """Sections dict + roles list -> the OnePager used by populate_pptx."""
+    return OnePager.from_sections(response_dic, roles)
+
+def save_intermediate(one_pager, output_path, output_format=None):
+    """Optional copy of the one-pager on disk (jsonl / parquet / excel, see one_pager_io)."""
+    if output_path is None:
+        return
+    with stage(detect_format(output_path, output_format)):
+        save_one_pager(one_pager, output_path, output_format)
+    print(f"✅ One-pager saved at: {os.path.abspath(output_path)}")
+
+def store_one_pager(one_pager, cv_path, flavor, tower_selected):
+    """
+    Adds the result to the searchable one-pager store (see one_pager_store); never fails the run.
+    Without a selected tower (batch, auto-detect) it is stored under the tower the model detected.
+    """
+    try:
+        one_pager_store = get_one_pager_store()
+    except Exception as e:
+        print(f"⚠️ Could not open the one-pager store: {e}")
+        return None
+    if not one_pager_store.enabled:
+        return None
+    run = current_run()
+    # The job queue / batch runs know the original file name (the job's PDF is <job_id>.pdf)
+    source_file = (run.metadata.get("file") if run is not None else None) or getattr(cv_path, "name", None)
+    if source_file is None and isinstance(cv_path, str):
+        source_file = os.path.basename(cv_path)
+    try:
+        with stage("store"):
+            one_pager_id = one_pager_store.save(one_pager, tower=tower_selected or one_pager.tower, flavor=flavor,
+                                                 source_file=source_file)
+    except Exception as e:
+        print(f"⚠️ Could not add the one-pager to the store: {e}")
+        return None
+    if run is not None:
+        run.metadata["one_pager_id"] = one_pager_id
+    return one_pager_id
+
+def generate_one_pager(cv_path, flavor, tower_selected, output_path=None, concurrent=True,
+                       single_call=False, compact=True, token_budget=DEFAULT_TOKEN_BUDGET, output_format=None,
+                       cv_text=None):
+    """Generate all sections and return the OnePager (see one_pager.py).
+
+    cv_text: output of prepare_cv_text when the caller already extracted it (cv_path is then not read).
 
+    output_path = None keeps the result in memory only; otherwise it is also written there,
+    in the format given by output_format or by the extension (.jsonl, .parquet, .xlsx).
+
+    concurrent = True sends the SECTIONS and ROLES requests at the same time,
+    False keeps the original one-after-the-other behaviour.
+    single_call = True replaces the flavor/sections/roles calls with one structured-output call.
+    compact / token_budget: see prepare_cv_text (CV compaction before the LLM calls).
+    """
+    mode = "single_call" if single_call else ("concurrent" if concurrent else "sequential")
+    try:
+        with track_run(flavor=flavor, tower=tower_selected, mode=mode):
+            one_pager = _generate_one_pager(cv_path, flavor, tower_selected, concurrent, single_call, compact,
+                                            token_budget, cv_text)
+            save_intermediate(one_pager, output_path, output_format)
+            store_one_pager(one_pager, cv_path, flavor, tower_selected)
+            return one_pager
+    except Exception as e:
+        print(f"Error generating one pager: {str(e)}")
+        raise
+
+def _generate_one_pager(cv_path, flavor, tower_selected, concurrent, single_call, compact, token_budget,
+                        cv_text=None):
+    if cv_text is None:
+        cv_text = prepare_cv_text(cv_path, compact=compact, token_budget=token_budget)
+
+    if single_call:
+        print("🔹 Generating: SECTIONS + ROLES in a single structured call...")
+        sections_dic, roles = generate_single_call(cv_text, flavor, tower_selected)
+        return build_one_pager(sections_dic, roles)
+
+    #Opcional
+
+    if flavor is not None: 
+        cv_text = add_flavor(cv_text, flavor)
+    else: 
+        pass 
+
+    if concurrent:
+        print("🔹 Generating: SECTIONS + RELEVANT EXPERIENCE (Roles) in parallel...")
+        sections, roles = generate_sections_and_roles(cv_text, tower_selected)
+    else:
         # Generate fixed sections
         print("🔹 Generating: SECTIONS...")
         sections = generate_sections(cv_text, tower_selected)
-        response_dic = json.loads(sections)
 
         # Generate dynamic roles
         print("🔹 Generating: RELEVANT EXPERIENCE (Roles)...")
         roles = generate_roles(cv_text)
-        for i, element in enumerate(roles):
-            response_dic[f"Role_{i+1}"] = element
-
-        # Create and return DataFrame
-        df = pd.DataFrame(list(response_dic.items()), columns=["section_name", "output"])
-        
-        # ✅ Save to Excel
-        df.to_excel(output_path, index=False)
-        print(f"✅ One-pager saved at: {os.path.abspath(output_path)}")
-        
-        return df
 
-    except Exception as e:
-        print(f"Error generating one pager: {str(e)}")
-        raise
\ No newline at end of file
+    return build_one_pager(parse_sections_json(sections), roles)
+
+def generate_one_pager_stream(cv_path, flavor, tower_selected, compact=True, token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Streaming variant of generate_one_pager for the UI. Yields events as soon as they are ready:
+        ("section", "NAME", text), ("role", "Role_1", text), ...
+        ("done", one_pager)  -> same OnePager generate_one_pager would return (not saved to disk, but stored)
+    SECTIONS and ROLES are streamed at the same time from two threads.
+    """
+    with track_run(flavor=flavor, tower=tower_selected, mode="stream"):
+        cv_text = prepare_cv_text(cv_path, compact=compact, token_budget=token_budget)
+        if flavor is not None:
+            cv_text = add_flavor(cv_text, flavor)
+        for event in stream_sections_and_roles(cv_text, tower_selected):
+            if event[0] == "done":
+                store_one_pager(event[1], cv_path, flavor, tower_selected)
+            yield event
+
+def stream_sections_and_roles(cv_text, tower_selected, sections_source=None, roles_source=None):
+    """
+    SECTIONS and ROLES streamed from two threads, merged into the events of generate_one_pager_stream.
+    sections_source / roles_source replace stream_sections / stream_roles (e.g. memoized versions
+    in pipeline_stages); they must yield the same items.
+    """
+    sections_source = sections_source or stream_sections
+    roles_source = roles_source or stream_roles
+    events = queue.Queue()
+    _END = object()
+
+    def produce_sections():
+        try:
+            for name, text in sections_source(cv_text, tower_selected):
+                events.put(("section", name, text))
+        except Exception as e:
+            events.put(("error", e))
+        finally:
+            events.put(_END)
+
+    def produce_roles():
+        try:
+            for i, role in enumerate(roles_source(cv_text)):
+                events.put(("role", f"Role_{i+1}", role))
+        except Exception as e:
+            events.put(("error", e))
+        finally:
+            events.put(_END)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        submit_in_context(executor, produce_sections)
+        submit_in_context(executor, produce_roles)
+
+        sections, roles, raw_sections = {}, [], None
+        running = 2
+        while running:
+            event = events.get()
+            if event is _END:
+                running -= 1
+            elif event[0] == "error":
+                raise event[1]
+            elif event[0] == "section" and event[1] == "__raw__":
+                raw_sections = event[2]
+            else:
+                if event[0] == "section":
+                    sections[event[1]] = event[2]
+                else:
+                    roles.append(event[2])
+                yield event
+
+    # The complete answer is authoritative; the incremental one is only for the progressive UI,
+    # and stands in for it only if it got the candidate (e.g. an answer cut after the last section)
+    try:
+        sections = parse_sections_json(raw_sections)
+    except (TypeError, ValueError):
+        if not sections.get("NAME"):
+            raise
+    yield ("done", build_one_pager(sections, roles))
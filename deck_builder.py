@@ -0,0 +1,90 @@
+import copy
+import io
+from populate_pptx import load_template, fill_slide
+
+# Relationships that belong to the slide itself and must not be copied to the clone
+_SKIP_RELS = ("/slideLayout", "/notesSlide")
+
+# r:embed / r:link / r:id attributes that point to the slide's relationships (images, links...)
+_R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_REL_ATTRS = [f"{{{_R_NS}}}{name}" for name in ("embed", "link", "id")]
+
+
+def clone_slide(prs, source):
+    """
+    Appends a copy of `source` (same layout, shapes, background and image relationships)
+    at the end of `prs` and returns it. Images are shared with the source slide, not duplicated.
+    """
+    new_slide = prs.slides.add_slide(source.slide_layout)
+    sp_tree = new_slide.shapes._spTree
+
+    # The layout adds its own empty placeholders; the clone only keeps the source shapes
+    for shape in list(new_slide.shapes):
+        sp_tree.remove(shape._element)
+
+    rid_map = {}
+    for rid, rel in source.part.rels.items():
+        if rel.reltype.endswith(_SKIP_RELS):
+            continue
+        if rel.is_external:
+            rid_map[rid] = new_slide.part.rels.get_or_add_ext_rel(rel.reltype, rel.target_ref)
+        else:
+            rid_map[rid] = new_slide.part.rels.get_or_add(rel.reltype, rel.target_part)
+
+    for element in source.shapes._spTree.iterchildren():
+        if element.tag.endswith(("}nvGrpSpPr", "}grpSpPr", "}extLst")):
+            continue
+        new_element = copy.deepcopy(element)
+        for node in new_element.iter():
+            for attr in _REL_ATTRS:
+                value = node.get(attr)
+                if value in rid_map:
+                    node.set(attr, rid_map[value])
+        sp_tree.insert_element_before(new_element, "p:extLst")
+
+    source_bg = source._element.cSld.bg
+    if source_bg is not None:
+        new_slide._element.cSld.insert(0, copy.deepcopy(source_bg))
+
+    return new_slide
+
+
+def _drop_slide(prs, position):
+    sld_id_lst = prs.slides._sldIdLst
+    sld_id = sld_id_lst[position]
+    prs.part.drop_rel(sld_id.rId)
+    sld_id_lst.remove(sld_id)
+
+
+def build_deck(one_pagers, output_path=None):
+    """
+    Builds a single presentation with one slide per candidate.
+
+    one_pagers: any iterable of OnePagers, e.g. a generator that reads/generates each candidate
+    on demand. Candidates are consumed one at a time, so only the slide XML accumulates, never
+    the candidates' one-pagers.
+
+    Returns the deck as a BytesIO; if output_path is given the bytes are also written there.
+    """
+    prs, shape_index = load_template()
+    template_slide = prs.slides[0]
+
+    n_candidates = 0
+    for one_pager in one_pagers:
+        slide = clone_slide(prs, template_slide)
+        fill_slide(slide, one_pager, shape_index)
+        n_candidates += 1
+        del one_pager
+
+    # The untouched template slide was only the source of the clones
+    if n_candidates:
+        _drop_slide(prs, 0)
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    if output_path is not None:
+        with open(output_path, "wb") as f:
+            f.write(buffer.getbuffer())
+    buffer.seek(0)
+    print(f"✅ Deck with {n_candidates} one-pagers was successfully created")
+    return buffer
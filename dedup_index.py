@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# Near-duplicate detection over the extracted CV text: MinHash signatures of word 3-shingles
+# and LSH banding, so a lookup only compares the CVs that share at least one band bucket.
+#
+# 128 permutations in 32 bands of 4 rows: two CVs with Jaccard similarity s share a bucket with
+# probability 1 - (1 - s^4)^32, i.e. ~1.0 at s=0.8, ~0.87 at s=0.5 and ~0.003 at s=0.1
+# (unrelated CVs), so almost only real candidates get compared.
+
+NUM_PERM = 128
+BANDS = 32
+SHINGLE_WORDS = 3
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", ".cache/dedup_index.sqlite")
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_WORD_RE = re.compile(r"\w+")
+
+# Fixed seed: signatures stored in earlier runs must stay comparable
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, k=SHINGLE_WORDS):
+    """Set of k-word shingles of the lower-cased text (punctuation and spacing are ignored)."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def minhash_signature(text):
+    """NUM_PERM uint32 MinHash values of the text's shingles."""
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64)
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity: share of equal MinHash values."""
+    return float(np.count_nonzero(signature_a == signature_b)) / NUM_PERM
+
+
+def band_keys(signature):
+    """One stable 64-bit bucket key per band (Python's hash() is salted per process)."""
+    rows = NUM_PERM // BANDS
+    return [
+        int.from_bytes(hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest(),
+                       "big", signed=True)
+        for band in range(BANDS)
+    ]
+
+
+class DedupIndex:
+    """
+    Persistent near-duplicate index of CV texts.
+
+    Signatures and their metadata (file, one-pager paths, tower, flavor...) are stored in SQLite
+    at `path`; the LSH buckets are rebuilt in memory when the index is opened, so lookups
+    never touch the disk (tens of microseconds with tens of thousands of CVs).
+
+    Concurrent workers use reserve() instead of query(): a CV with no match is indexed at once as
+    pending (in memory only), so a near-duplicate processed at the same time finds it and can
+    wait() for it instead of being generated twice. add() completes the entry, release() drops it.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._signatures = {}
+        self._meta = {}
+        self._buckets = [{} for _ in range(BANDS)]
+        # doc_id -> (Event set when it is added or released, entry it replaced or None)
+        self._pending = {}
+        self._init_db()
+        self._load()
+
+    # ---------- storage ----------
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS documents (
+                       doc_id TEXT PRIMARY KEY,
+                       signature BLOB NOT NULL,
+                       meta TEXT NOT NULL,
+                       created_at REAL NOT NULL
+                   )"""
+            )
+
+    def _load(self):
+        with self._connect() as conn:
+            for doc_id, signature, meta in conn.execute("SELECT doc_id, signature, meta FROM documents"):
+                self._remember(doc_id, np.frombuffer(signature, dtype=np.uint32), json.loads(meta))
+
+    def _remember(self, doc_id, signature, meta):
+        if doc_id in self._signatures:
+            self._forget(doc_id)
+        self._signatures[doc_id] = signature
+        self._meta[doc_id] = meta
+        for band, key in enumerate(band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(doc_id)
+
+    def _forget(self, doc_id):
+        for band, key in enumerate(band_keys(self._signatures.pop(doc_id))):
+            bucket = self._buckets[band][key]
+            bucket.remove(doc_id)
+            if not bucket:
+                del self._buckets[band][key]
+        self._meta.pop(doc_id, None)
+
+    def _matches(self, signature, threshold):
+        candidates = set()
+        for band, key in enumerate(band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        if not candidates:
+            return []
+        candidates = list(candidates)
+        stacked = np.stack([self._signatures[doc_id] for doc_id in candidates])
+        similarities = np.count_nonzero(stacked == signature, axis=1) / NUM_PERM
+        matches = [
+            (doc_id, float(similarity), self._meta[doc_id])
+            for doc_id, similarity in zip(candidates, similarities)
+            if similarity >= threshold
+        ]
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _settle(self, doc_id):
+        """Wakes up the workers waiting on a pending doc_id; returns the entry it had replaced."""
+        event, previous = self._pending.pop(doc_id, (None, None))
+        if event is not None:
+            event.set()
+        return previous
+
+    # ---------- public API ----------
+    def add(self, doc_id, text=None, meta=None, signature=None):
+        """Indexes a CV (replacing a previous entry with the same doc_id)."""
+        signature = minhash_signature(text) if signature is None else signature
+        meta = meta or {}
+        with self._lock:
+            self._remember(doc_id, signature, meta)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, signature, meta, created_at) VALUES (?, ?, ?, ?)",
+                (doc_id, signature.tobytes(), json.dumps(meta, ensure_ascii=False), time.time()),
+            )
+        with self._lock:
+            self._settle(doc_id)
+
+    def add_many(self, items):
+        """Bulk add of (doc_id, signature, meta) in one transaction, e.g. to backfill the index."""
+        items = list(items)
+        with self._lock:
+            for doc_id, signature, meta in items:
+                self._remember(doc_id, signature, meta)
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO documents (doc_id, signature, meta, created_at) VALUES (?, ?, ?, ?)",
+                [(doc_id, signature.tobytes(), json.dumps(meta, ensure_ascii=False), now)
+                 for doc_id, signature, meta in items],
+            )
+
+    def query(self, text=None, signature=None, threshold=None):
+        """[(doc_id, similarity, meta)] of the indexed CVs at or above threshold, most similar first."""
+        signature = minhash_signature(text) if signature is None else signature
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            return self._matches(signature, threshold)
+
+    def reserve(self, doc_id, text=None, meta=None, signature=None, threshold=None):
+        """
+        query() and, when no other CV matches, indexing doc_id as pending, in one step. Returns the
+        matches of the other CVs; pending ones have meta["pending"] = True (see wait()).
+        A reserved doc_id must end with add() or release().
+        """
+        signature = minhash_signature(text) if signature is None else signature
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            matches = [match for match in self._matches(signature, threshold) if match[0] != doc_id]
+            if not matches and doc_id not in self._pending:
+                previous = (self._signatures[doc_id], self._meta[doc_id]) if doc_id in self._signatures else None
+                self._remember(doc_id, signature, dict(meta or {}, pending=True))
+                self._pending[doc_id] = (threading.Event(), previous)
+        return matches
+
+    def wait(self, doc_id, timeout=None):
+        """Blocks until a pending doc_id is added or released (returns at once otherwise)."""
+        with self._lock:
+            event, _ = self._pending.get(doc_id, (None, None))
+        if event is not None:
+            event.wait(timeout)
+
+    def release(self, doc_id):
+        """Drops a pending reservation (its CV failed), restoring the entry it had replaced."""
+        with self._lock:
+            if doc_id not in self._pending:
+                return
+            self._forget(doc_id)
+            previous = self._settle(doc_id)
+            if previous is not None:
+                self._remember(doc_id, *previous)
+
+    def find_duplicate(self, text=None, signature=None, threshold=None):
+        """The most similar indexed CV above threshold, or None."""
+        matches = self.query(text, signature, threshold)
+        return matches[0] if matches else None
+
+    def remove(self, doc_id):
+        with self._lock:
+            if doc_id in self._signatures:
+                self._forget(doc_id)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+    def __len__(self):
+        return len(self._signatures)
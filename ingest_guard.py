@@ -0,0 +1,129 @@
+import hashlib
+import io
+import os
+import tempfile
+
+# What a single CV may cost before any work starts (env overrides, 0 = no limit). Checked by
+# the app on upload and again by prepare_cv_text, so batch CVs go through the same limits.
+MAX_PDF_BYTES = int(os.getenv("CV_MAX_BYTES", str(20 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("CV_MAX_PAGES", "40"))
+# Extraction stops after this many characters (the token budget keeps far less anyway)
+MAX_TEXT_CHARS = int(os.getenv("CV_MAX_CHARS", "200000"))
+# Uploads above this size are copied to a temp file on disk instead of being kept in memory
+SPOOL_BYTES = int(os.getenv("CV_SPOOL_BYTES", str(2 * 1024 * 1024)))
+
+# Upload limit of st.file_uploader, in MB (rejected by the browser before it is even sent)
+MAX_UPLOAD_MB = -(-MAX_PDF_BYTES // (1024 * 1024)) if MAX_PDF_BYTES else None
+
+CHUNK_BYTES = 1024 * 1024
+
+
+class CVRejected(ValueError):
+    """The PDF is over one of the ingestion limits; the message is meant for the user as-is."""
+
+
+def _mb(n_bytes):
+    return f"{n_bytes / (1024 * 1024):.1f} MB"
+
+
+def iter_chunks(source, chunk_bytes=CHUNK_BYTES):
+    """The contents of a path, bytes or file-like object (read from the start), chunk by chunk."""
+    if isinstance(source, (bytes, bytearray)):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_bytes):
+            yield view[start:start + chunk_bytes]
+        return
+    if hasattr(source, "read"):
+        source.seek(0)
+        while chunk := source.read(chunk_bytes):
+            yield chunk
+        source.seek(0)
+        return
+    with open(source, "rb") as f:
+        while chunk := f.read(chunk_bytes):
+            yield chunk
+
+
+def source_size(source):
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if hasattr(source, "read"):
+        position = source.seek(0, io.SEEK_END)
+        source.seek(0)
+        return position
+    return os.path.getsize(source)
+
+
+def sha256_of(source):
+    """sha256 hex digest of a path, bytes or file-like object, without loading it whole."""
+    digest = hashlib.sha256()
+    for chunk in iter_chunks(source):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def check_size(n_bytes, max_bytes=MAX_PDF_BYTES):
+    if max_bytes and n_bytes > max_bytes:
+        raise CVRejected(
+            f"The PDF is {_mb(n_bytes)}, over the {_mb(max_bytes)} limit. "
+            "Please upload the CV alone (no portfolio or attachments), or a compressed export."
+        )
+
+
+def count_pages(source):
+    """Page count from the PDF's page tree, without parsing any page (pdfminer, as pdfplumber uses)."""
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    f = source if hasattr(source, "read") else open(source, "rb")
+    try:
+        f.seek(0)
+        document = PDFDocument(PDFParser(f))
+        count = resolve1(resolve1(document.catalog.get("Pages") or {}).get("Count"))
+        if not isinstance(count, int):
+            count = sum(1 for _ in PDFPage.create_pages(document))
+        return count
+    finally:
+        if f is source:
+            f.seek(0)
+        else:
+            f.close()
+
+
+def check_pdf(source, max_bytes=MAX_PDF_BYTES, max_pages=MAX_PDF_PAGES):
+    """Size and page-count limits of a CV; returns its page count or raises CVRejected."""
+    check_size(source_size(source), max_bytes)
+    try:
+        pages = count_pages(source)
+    except Exception as e:
+        raise CVRejected(f"The file could not be read as a PDF ({type(e).__name__}).") from e
+    if max_pages and pages > max_pages:
+        raise CVRejected(
+            f"The PDF has {pages} pages; CVs of up to {max_pages} pages are accepted. "
+            "Please upload the CV alone, without portfolios or annexes."
+        )
+    return pages
+
+
+def spool(source, max_bytes=MAX_PDF_BYTES, spool_bytes=SPOOL_BYTES):
+    """
+    Copy of an upload that stays in memory up to spool_bytes and moves to a temp file above it,
+    read chunk by chunk (the size limit is enforced while copying). Returns (file, sha256 hex).
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=spool_bytes, suffix=".pdf")
+    digest, size = hashlib.sha256(), 0
+    try:
+        for chunk in iter_chunks(source):
+            size += len(chunk)
+            check_size(size, max_bytes)
+            digest.update(chunk)
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled, digest.hexdigest()
@@ -0,0 +1,353 @@
+import contextvars
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+# USD per 1M tokens, used for the cost estimate of each run
+PRICES_PER_MILLION = {
+    "gpt-5-mini": {"input": 0.25, "cached_input": 0.025, "output": 2.00},
+}
+
+# Where every finished run is appended as one JSON line (empty = disabled)
+RUNS_JSONL_PATH = os.getenv("ONE_PAGER_RUNS_JSONL", "")
+
+_current_run = contextvars.ContextVar("one_pager_run", default=None)
+_current_stage = contextvars.ContextVar("one_pager_stage", default=None)
+
+def rss_mb():
+    """Resident memory of the process in MB (/proc on Linux, else the peak so far)."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Last finished runs of this process (gauges of the Prometheus export, run history)
+recent_runs = deque(maxlen=500)
+
+
+@dataclass
+class LLMCall:
+    stage: str
+    model: str
+    seconds: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cache_hit: bool = False
+
+    @property
+    def cost_usd(self):
+        prices = PRICES_PER_MILLION.get(self.model)
+        if prices is None or self.cache_hit:
+            return 0.0
+        uncached = self.prompt_tokens - self.cached_tokens
+        return (
+            uncached * prices["input"]
+            + self.cached_tokens * prices["cached_input"]
+            + self.completion_tokens * prices["output"]
+        ) / 1_000_000
+
+
+@dataclass
+class RunRecord:
+    """
+    Everything measured for one one-pager: stage wall times, LLM usage, retries and cost.
+    peak_rss_mb is the highest process RSS sampled while the run was active (stage ends and each
+    extracted page): other runs of the same process are included, which is what sizes a replica.
+    """
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: float = field(default_factory=time.time)
+    metadata: dict = field(default_factory=dict)
+    stages: dict = field(default_factory=dict)
+    llm_calls: list = field(default_factory=list)
+    retries: int = 0
+    queue_wait_seconds: float = 0.0
+    status: str = "running"
+    error: str = None
+    total_seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def add_stage(self, name, seconds):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_llm_call(self, call):
+        with self._lock:
+            self.llm_calls.append(call)
+
+    def add_retry(self, n=1):
+        with self._lock:
+            self.retries += n
+
+    def add_queue_wait(self, seconds):
+        with self._lock:
+            self.queue_wait_seconds += seconds
+
+    def sample_memory(self):
+        rss = rss_mb()
+        with self._lock:
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+
+    def totals(self):
+        calls = [call for call in self.llm_calls if not call.cache_hit]
+        return {
+            "llm_calls": len(calls),
+            "llm_cache_hits": len(self.llm_calls) - len(calls),
+            "prompt_tokens": sum(call.prompt_tokens for call in calls),
+            "completion_tokens": sum(call.completion_tokens for call in calls),
+            "cached_tokens": sum(call.cached_tokens for call in calls),
+            "cost_usd": round(sum(call.cost_usd for call in calls), 6),
+        }
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                "metadata": dict(self.metadata),
+                "status": self.status,
+                "error": self.error,
+                "total_seconds": round(self.total_seconds, 4),
+                "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+                "retries": self.retries,
+                "queue_wait_seconds": round(self.queue_wait_seconds, 4),
+                "peak_rss_mb": round(self.peak_rss_mb, 1),
+                "calls": [asdict(call) for call in self.llm_calls],
+                **self.totals(),
+            }
+
+
+class RunTotals:
+    """Counters summed over finished runs: statuses, stage times, tokens, calls, retries and cost."""
+
+    def __init__(self, runs=()):
+        self._lock = threading.Lock()
+        self.status_count = {}
+        self.stage_seconds = {}
+        self.stage_count = {}
+        self.tokens = {"prompt": 0, "completion": 0, "cached": 0}
+        self.llm_calls = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.cost_usd = 0.0
+        for run in runs:
+            self.add(run)
+
+    def add(self, run):
+        data = run.to_dict()
+        with self._lock:
+            self.status_count[data["status"]] = self.status_count.get(data["status"], 0) + 1
+            for name, seconds in data["stages"].items():
+                self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+                self.stage_count[name] = self.stage_count.get(name, 0) + 1
+            self.tokens["prompt"] += data["prompt_tokens"]
+            self.tokens["completion"] += data["completion_tokens"]
+            self.tokens["cached"] += data["cached_tokens"]
+            self.llm_calls += data["llm_calls"]
+            self.cache_hits += data["llm_cache_hits"]
+            self.retries += data["retries"]
+            self.cost_usd += data["cost_usd"]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "status_count": dict(self.status_count),
+                "stage_seconds": dict(self.stage_seconds),
+                "stage_count": dict(self.stage_count),
+                "tokens": dict(self.tokens),
+                "llm_calls": self.llm_calls,
+                "cache_hits": self.cache_hits,
+                "retries": self.retries,
+                "cost_usd": self.cost_usd,
+            }
+
+
+# Every run finished since the process started: the Prometheus counters must never go down,
+# which a sum over recent_runs does as soon as the deque rotates
+lifetime_totals = RunTotals()
+
+
+def current_run():
+    return _current_run.get()
+
+
+@contextmanager
+def track_run(**metadata):
+    """
+    Opens a run record for one one-pager (or joins the one already open in this context, so the
+    UI/CLI can wrap generation + render while generate_one_pager still works on its own).
+    """
+    existing = _current_run.get()
+    if existing is not None:
+        existing.metadata.update({k: v for k, v in metadata.items() if k not in existing.metadata})
+        yield existing
+        return
+
+    run = RunRecord(metadata=metadata)
+    token = _current_run.set(run)
+    start = time.perf_counter()
+    run.sample_memory()
+    try:
+        yield run
+        run.status = "ok"
+    except Exception as e:
+        run.status = "error"
+        run.error = str(e)
+        raise
+    finally:
+        run.total_seconds = time.perf_counter() - start
+        run.sample_memory()
+        _current_run.reset(token)
+        recent_runs.append(run)
+        lifetime_totals.add(run)
+        if RUNS_JSONL_PATH:
+            export_jsonl([run], RUNS_JSONL_PATH)
+
+
+@contextmanager
+def stage(name):
+    """Times a pipeline stage into the current run (no-op outside track_run)."""
+    token = _current_stage.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_stage.reset(token)
+        run = _current_run.get()
+        if run is not None:
+            run.add_stage(name, elapsed)
+            run.sample_memory()
+
+
+def record_memory():
+    """Samples the process RSS into the current run, e.g. inside a long stage (no-op outside track_run)."""
+    run = _current_run.get()
+    if run is not None:
+        run.sample_memory()
+
+
+def _usage_value(obj, name):
+    value = getattr(obj, name, None) if obj is not None else None
+    return value or 0
+
+
+def record_llm_call(model, seconds, usage=None, cache_hit=False):
+    """Stores the `usage` of an OpenAI response (or a cache hit) in the current run."""
+    run = _current_run.get()
+    if run is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None) if usage is not None else None
+    run.add_llm_call(LLMCall(
+        stage=_current_stage.get() or "llm",
+        model=model,
+        seconds=round(seconds, 4),
+        prompt_tokens=_usage_value(usage, "prompt_tokens"),
+        completion_tokens=_usage_value(usage, "completion_tokens"),
+        cached_tokens=_usage_value(details, "cached_tokens"),
+        cache_hit=cache_hit,
+    ))
+
+
+def record_retry(n=1):
+    run = _current_run.get()
+    if run is not None:
+        run.add_retry(n)
+
+
+def record_queue_wait(seconds):
+    """Time an LLM request spent waiting for the scheduler (rate limits / concurrency cap)."""
+    run = _current_run.get()
+    if run is not None:
+        run.add_queue_wait(seconds)
+
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """executor.submit that keeps the current run/stage visible inside the worker thread."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# ---------- Exports ----------
+
+def export_jsonl(runs, path):
+    """Appends each run as one JSON line."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for run in runs:
+            f.write(json.dumps(run.to_dict(), ensure_ascii=False) + "\n")
+
+
+def to_jsonl(runs):
+    return "".join(json.dumps(run.to_dict(), ensure_ascii=False) + "\n" for run in runs)
+
+
+def to_prometheus(runs=None):
+    """
+    Prometheus text exposition format. By default counters and summaries cover every run of the
+    process (lifetime_totals) and the peak RSS gauge the recent ones; with `runs`, all of them are
+    computed over those runs only (e.g. the metrics.prom of one batch).
+    """
+    if runs is None:
+        totals, runs = lifetime_totals.snapshot(), list(recent_runs)
+    else:
+        runs = list(runs)
+        totals = RunTotals(runs).snapshot()
+    status_count, stage_seconds, stage_count = totals["status_count"], totals["stage_seconds"], totals["stage_count"]
+    tokens, llm_calls, cache_hits = totals["tokens"], totals["llm_calls"], totals["cache_hits"]
+    retries, cost = totals["retries"], totals["cost_usd"]
+    peak_rss = max((run.peak_rss_mb for run in runs), default=0.0)
+
+    lines = [
+        "# HELP one_pager_runs_total One-pager runs by final status.",
+        "# TYPE one_pager_runs_total counter",
+    ]
+    lines += [f'one_pager_runs_total{{status="{status}"}} {count}' for status, count in sorted(status_count.items())]
+    lines += [
+        "# HELP one_pager_stage_seconds Wall time spent per pipeline stage.",
+        "# TYPE one_pager_stage_seconds summary",
+    ]
+    for name in sorted(stage_seconds):
+        lines.append(f'one_pager_stage_seconds_sum{{stage="{name}"}} {stage_seconds[name]:.6f}')
+        lines.append(f'one_pager_stage_seconds_count{{stage="{name}"}} {stage_count[name]}')
+    lines += [
+        "# HELP one_pager_llm_tokens_total Tokens reported by the OpenAI usage field.",
+        "# TYPE one_pager_llm_tokens_total counter",
+    ]
+    lines += [f'one_pager_llm_tokens_total{{kind="{kind}"}} {value}' for kind, value in tokens.items()]
+    lines += [
+        "# HELP one_pager_llm_calls_total LLM requests sent (cache hits excluded).",
+        "# TYPE one_pager_llm_calls_total counter",
+        f"one_pager_llm_calls_total {llm_calls}",
+        "# HELP one_pager_llm_cache_hits_total LLM calls answered from the response cache.",
+        "# TYPE one_pager_llm_cache_hits_total counter",
+        f"one_pager_llm_cache_hits_total {cache_hits}",
+        "# HELP one_pager_llm_retries_total LLM request retries.",
+        "# TYPE one_pager_llm_retries_total counter",
+        f"one_pager_llm_retries_total {retries}",
+        "# HELP one_pager_llm_cost_usd_total Estimated LLM cost in USD.",
+        "# TYPE one_pager_llm_cost_usd_total counter",
+        f"one_pager_llm_cost_usd_total {cost:.6f}",
+        "# HELP one_pager_peak_rss_megabytes Highest process RSS sampled during the recent runs.",
+        "# TYPE one_pager_peak_rss_megabytes gauge",
+        f"one_pager_peak_rss_megabytes {peak_rss:.1f}",
+    ]
+    return "\n".join(lines) + "\n"
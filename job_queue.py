@@ -0,0 +1,277 @@
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ingest_guard import check_size, iter_chunks
+from instrumentation import track_run
+from one_pager import OnePager
+
+DEFAULT_JOBS_PATH = os.getenv("ONE_PAGER_JOBS_PATH", ".cache/jobs.sqlite")
+DEFAULT_JOB_WORKERS = int(os.getenv("ONE_PAGER_JOB_WORKERS", "4"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Queued/running jobs are stamped by their process this often; another process only takes over
+# (resumes) a job whose stamp is older than STALE_AFTER_SECONDS, e.g. replicas sharing the file
+HEARTBEAT_SECONDS = 30
+STALE_AFTER_SECONDS = 4 * HEARTBEAT_SECONDS
+# Finished jobs past their TTL (and their PDF / PPTX files) are deleted at most this often
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class JobQueue:
+    """
+    Background one-pager generation for the Streamlit app.
+
+    Jobs are rows of a SQLite table (queued -> running -> done / failed) executed by a local
+    thread pool, so a slow CV never blocks the script run of its session, and a rerun or a
+    reconnect only has to look the job up again by id. The uploaded PDF and the rendered
+    PPTX live next to the database in `<path>.files/`.
+
+    Every queued/running job has an owner (this process) and a heartbeat refreshed by a
+    background thread. Jobs whose owner stopped sending heartbeats (crash, redeploy, another
+    replica gone) are picked up again, on start and then periodically; jobs of a live process
+    are left alone. The same thread purges finished jobs older than `ttl_seconds` together
+    with their files (uploaded CVs are personal data).
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_PATH, workers=DEFAULT_JOB_WORKERS, ttl_seconds=7 * 24 * 3600,
+                 heartbeat_seconds=HEARTBEAT_SECONDS, stale_after_seconds=STALE_AFTER_SECONDS,
+                 purge_interval_seconds=PURGE_INTERVAL_SECONDS):
+        self.path = path
+        self.files_dir = f"{path}.files"
+        self.ttl_seconds = ttl_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="one-pager-job")
+        self._init_db()
+        self._purge()
+        self._last_purge = time.monotonic()
+        self._resume()
+        threading.Thread(target=self._maintain, name="one-pager-job-heartbeat", daemon=True).start()
+
+    # ---------- storage ----------
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        os.makedirs(self.files_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                       id TEXT PRIMARY KEY,
+                       status TEXT NOT NULL,
+                       params TEXT NOT NULL,
+                       partial TEXT NOT NULL DEFAULT '[]',
+                       result TEXT,
+                       metrics TEXT,
+                       error TEXT,
+                       created_at REAL NOT NULL,
+                       started_at REAL,
+                       finished_at REAL
+                   )"""
+            )
+            if "owner" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                # Databases created before owners / heartbeats: their pending jobs count as stale
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _file(self, job_id, extension):
+        return os.path.join(self.files_dir, f"{job_id}.{extension}")
+
+    def _purge(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self._connect() as conn:
+            old = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, cutoff)
+            )]
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in old])
+        for job_id in old:
+            for extension in ("pdf", "pptx"):
+                try:
+                    os.remove(self._file(job_id, extension))
+                except FileNotFoundError:
+                    pass
+
+    def _resume(self):
+        """Takes over and re-queues the unfinished jobs whose owner stopped sending heartbeats."""
+        now = time.time()
+        cutoff = now - self.stale_after_seconds
+        stale = "status IN (?, ?) AND (heartbeat_at IS NULL OR heartbeat_at < ?)"
+        resumed = []
+        with self._connect() as conn:
+            candidates = [row[0] for row in conn.execute(
+                f"SELECT id FROM jobs WHERE {stale} ORDER BY created_at", (QUEUED, RUNNING, cutoff)
+            )]
+            for job_id in candidates:
+                # Conditional update: only one process wins a job several of them found stale
+                cursor = conn.execute(
+                    f"UPDATE jobs SET status = ?, partial = '[]', owner = ?, heartbeat_at = ? WHERE id = ? AND {stale}",
+                    (QUEUED, self.owner, now, job_id, QUEUED, RUNNING, cutoff),
+                )
+                if cursor.rowcount:
+                    resumed.append(job_id)
+        for job_id in resumed:
+            print(f"♻️ Resuming job {job_id} (its previous owner stopped)")
+            self._executor.submit(self._run, job_id)
+
+    def _heartbeat(self):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                (time.time(), self.owner, QUEUED, RUNNING),
+            )
+
+    def _maintain(self):
+        """Background loop: heartbeats of this process's jobs, takeover of stale ones, periodic purge."""
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            try:
+                self._heartbeat()
+                self._resume()
+                if time.monotonic() - self._last_purge >= self.purge_interval_seconds:
+                    self._purge()
+                    self._last_purge = time.monotonic()
+            except sqlite3.Error as e:
+                print(f"⚠️ Job queue maintenance failed: {e}")
+            except RuntimeError:
+                # The executor no longer accepts jobs: the interpreter is shutting down
+                return
+
+    # ---------- worker ----------
+    def _run(self, job_id):
+        self._update(job_id, status=RUNNING, started_at=time.time(), owner=self.owner, heartbeat_at=time.time())
+        params = self.get(job_id)["params"]
+
+        # Stages already computed for the same PDF (another tower / flavor try) are reused
+        from pipeline_stages import render_stage, stream_one_pager
+
+        partial = []
+        try:
+            with track_run(source="ui", file=params.get("file_name"), job_id=job_id) as run:
+                one_pager = None
+                for event in stream_one_pager(
+                    cv_path=self._file(job_id, "pdf"),
+                    flavor=params.get("flavor"),
+                    tower_selected=params.get("tower"),
+                ):
+                    if event[0] == "done":
+                        one_pager = event[1]
+                    else:
+                        # Sections/roles already written, for the progressive view while it runs
+                        partial.append(list(event[1:]))
+                        self._update(job_id, partial=json.dumps(partial, ensure_ascii=False))
+                pptx_bytes = render_stage(one_pager)
+            with open(self._file(job_id, "pptx"), "wb") as f:
+                f.write(pptx_bytes)
+            self._update(
+                job_id,
+                status=DONE,
+                result=one_pager.to_json(),
+                metrics=json.dumps(run.to_dict(), ensure_ascii=False),
+                finished_at=time.time(),
+            )
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+
+    # ---------- public API ----------
+    def submit(self, pdf, file_name, tower=None, flavor=None):
+        """
+        Stores the PDF (bytes or file object, copied to disk chunk by chunk), queues the job and
+        returns its id. Raises ingest_guard.CVRejected if the PDF is over the size limit.
+        """
+        job_id = uuid.uuid4().hex
+        pdf_path, size = self._file(job_id, "pdf"), 0
+        try:
+            with open(pdf_path, "wb") as f:
+                for chunk in iter_chunks(pdf):
+                    size += len(chunk)
+                    check_size(size)
+                    f.write(chunk)
+        except Exception:
+            # open() itself may have failed: the original error (e.g. CVRejected) is the one to raise
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(pdf_path)
+            raise
+        params = {"file_name": file_name, "tower": tower, "flavor": flavor}
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, created_at, owner, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params, ensure_ascii=False), time.time(), self.owner, time.time()),
+            )
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id):
+        """The job as a dict (params/partial/metrics decoded), or None if it doesn't exist (anymore)."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["partial"] = json.loads(job["partial"])
+        job["metrics"] = json.loads(job["metrics"]) if job["metrics"] else None
+        return job
+
+    def result_one_pager(self, job_id):
+        job = self.get(job_id)
+        if job is None or job["status"] != DONE:
+            return None
+        result = json.loads(job["result"])
+        if isinstance(result, list):
+            # Jobs finished before the OnePager model kept the DataFrame records
+            return OnePager.from_rows((row["section_name"], row["output"]) for row in result)
+        return OnePager.from_dict(result)
+
+    def result_dataframe(self, job_id):
+        """section_name / output DataFrame of the result, for the Streamlit preview."""
+        one_pager = self.result_one_pager(job_id)
+        return None if one_pager is None else one_pager.to_dataframe()
+
+    def result_pptx(self, job_id):
+        with open(self._file(job_id, "pptx"), "rb") as f:
+            return f.read()
+
+    def position(self, job_id):
+        """Number of queued jobs created before this one (0 = next to start)."""
+        with self._connect() as conn:
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < "
+                "(SELECT created_at FROM jobs WHERE id = ?)", (QUEUED, job_id)
+            ).fetchone()
+        return count
+
+    def stats(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide JobQueue shared by every Streamlit session, created on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from resources import read_prompt_file
+
+
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+
+
+def file_fingerprint(path):
+    """Hash of a prompt file's contents (roles/*.md, prompt_dictionary/*.md)."""
+    return hashlib.sha256(read_prompt_file(path).encode("utf-8")).hexdigest()
+
+
+def make_cache_key(model, prompt, prompt_files=(), params=None):
+    """
+    Content-addressed key: sha256 of the model, the fully rendered prompt and the
+    current contents of every prompt file used to build it (plus any extra request params,
+    e.g. a response_format).
+
+    Editing a role .md file changes its fingerprint and therefore the key, so stale
+    entries are never served again (they just age out of the cache).
+    """
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "files": {path: file_fingerprint(path) for path in sorted(prompt_files)},
+    }
+    if params:
+        payload["params"] = params
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM completions.
+
+    - memory: in-process LRU with at most `memory_entries` items.
+    - disk: SQLite file at `path` with at most `disk_entries` rows; rows older than
+      `ttl_seconds` are treated as misses and purged.
+
+    Counters are available through `stats()`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=256, disk_entries=5000,
+                 ttl_seconds=30 * 24 * 3600, enabled=True):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        if self.enabled and self.path:
+            self._init_disk()
+
+    # ---------- disk tier ----------
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_disk(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       value TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       last_access REAL NOT NULL
+                   )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+
+    def _disk_get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def _disk_set(self, key, value):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            evicted = 0
+            if self.ttl_seconds is not None:
+                evicted += conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+                ).rowcount
+            (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.disk_entries:
+                evicted += conn.execute(
+                    """DELETE FROM responses WHERE key IN (
+                           SELECT key FROM responses ORDER BY last_access ASC LIMIT ?
+                       )""",
+                    (count - self.disk_entries,),
+                ).rowcount
+        return evicted
+
+    # ---------- public API ----------
+    def get(self, key):
+        """Return the cached completion text for `key`, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._memory[key]
+        value = self._disk_get(key) if self.path else None
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._remember(key, value)
+        return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._remember(key, value)
+            self._counters["writes"] += 1
+        if self.path:
+            evicted = self._disk_set(key, value)
+            with self._lock:
+                self._counters["evictions"] += evicted
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.enabled and self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Hit/miss counters plus the hit rate, e.g. to show the savings in the UI."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+response_cache = ResponseCache(enabled=os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes"))
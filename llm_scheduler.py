@@ -0,0 +1,275 @@
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from instrumentation import record_queue_wait, record_retry
+
+# Request priorities: lower value = served first. The UI is interactive by default,
+# main.py marks its CVs as batch work, prefetch.py its speculative calls (made on upload).
+INTERACTIVE = 0
+SPECULATIVE = 5
+BATCH = 10
+
+_priority = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+def _env_number(name, default, cast=int):
+    value = os.getenv(name, "")
+    return cast(value) if value else default
+
+
+@contextmanager
+def request_priority(level):
+    """Every LLM call made inside this block (and in threads started with submit_in_context) uses `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, holds at most one minute worth (0 = unlimited)."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` is available (0 = now). A request bigger than the bucket waits for a full one."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        if self.capacity:
+            self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Corrects an estimate once the real usage is known (can go negative: later calls wait longer)."""
+        if self.capacity:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def _retry_after(error):
+    """Seconds from the Retry-After header of a 429/503, if the API sent one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """429, timeouts, connection errors and 5xx. Any other API error (400, 401...) fails straight away."""
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError,
+                          openai.InternalServerError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and (error.status_code in (408, 409) or error.status_code >= 500)
+
+
+class LLMScheduler:
+    """
+    Admission control shared by every LLM call of the process (UI sessions, batch workers):
+    requests- and tokens-per-minute buckets, a concurrency cap and a priority queue, plus
+    jittered exponential backoff on retryable errors.
+    """
+
+    def __init__(self, rpm=500, tpm=200_000, max_concurrency=8, max_retries=5, base_delay=1.0, max_delay=30.0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._waits = deque(maxlen=1000)
+        self._counters = {"admitted": 0, "completed": 0, "retries": 0, "failed": 0}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            rpm=_env_number("LLM_RPM", 500),
+            tpm=_env_number("LLM_TPM", 200_000),
+            max_concurrency=_env_number("LLM_MAX_CONCURRENCY", 8),
+            max_retries=_env_number("LLM_MAX_RETRIES", 5),
+            base_delay=_env_number("LLM_BACKOFF_BASE", 1.0, float),
+            max_delay=_env_number("LLM_BACKOFF_MAX", 30.0, float),
+        )
+
+    # ---------- Admission ----------
+
+    def _acquire(self, tokens, priority):
+        ticket = (priority, next(self._seq))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                if self._waiting[0] == ticket and self._active < self.max_concurrency:
+                    wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if wait <= 0:
+                        break
+                    # Head of the queue keeps its place while the buckets refill
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            heapq.heappop(self._waiting)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._active += 1
+            self._counters["admitted"] += 1
+            waited = time.monotonic() - start
+            self._waits.append(waited)
+            self._cond.notify_all()
+        record_queue_wait(waited)
+
+    def _release(self, estimated_tokens, used_tokens=None):
+        with self._cond:
+            self._active -= 1
+            if used_tokens is not None:
+                self.tokens.adjust(used_tokens - estimated_tokens)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt, error):
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        with self._cond:
+            self._counters["retries"] += 1
+        record_retry()
+        print(f"⚠️ LLM request failed ({type(error).__name__}), retrying in {delay:.1f}s "
+              f"(attempt {attempt + 1}/{self.max_retries})")
+        time.sleep(delay)
+
+    def _fail(self):
+        with self._cond:
+            self._counters["failed"] += 1
+
+    @staticmethod
+    def _used_tokens(usage):
+        if usage is None:
+            return None
+        return (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+
+    # ---------- Public API ----------
+
+    def call(self, request, estimated_tokens=0, priority=None):
+        """Runs request() (a blocking completions.create) once admitted; retries retryable errors."""
+        priority = _priority.get() if priority is None else priority
+        for attempt in range(self.max_retries + 1):
+            self._acquire(estimated_tokens, priority)
+            try:
+                response = request()
+            except Exception as e:
+                self._release(estimated_tokens)
+                if attempt < self.max_retries and is_retryable(e):
+                    self._backoff(attempt, e)
+                    continue
+                self._fail()
+                raise
+            self._release(estimated_tokens, self._used_tokens(getattr(response, "usage", None)))
+            with self._cond:
+                self._counters["completed"] += 1
+            return response
+
+    def stream(self, request, estimated_tokens=0, priority=None):
+        """
+        Generator version of call() for stream=True requests: the concurrency slot is held until
+        the stream is consumed. Only the opening request is retried, never a half-read stream.
+        """
+        priority = _priority.get() if priority is None else priority
+        for attempt in range(self.max_retries + 1):
+            self._acquire(estimated_tokens, priority)
+            try:
+                stream = request()
+                break
+            except Exception as e:
+                self._release(estimated_tokens)
+                if attempt < self.max_retries and is_retryable(e):
+                    self._backoff(attempt, e)
+                    continue
+                self._fail()
+                raise
+
+        usage = None
+        finished = False
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+            finished = True
+        except Exception:
+            self._fail()
+            raise
+        finally:
+            if not finished and hasattr(stream, "close"):
+                # Consumer stopped early (e.g. a cancelled prefetch): drop the connection so the
+                # API stops generating tokens nobody will read
+                stream.close()
+            self._release(estimated_tokens, self._used_tokens(usage))
+        with self._cond:
+            self._counters["completed"] += 1
+
+    def stats(self):
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "queue_depth": len(self._waiting),
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                **self._counters,
+                "wait_avg_s": round(sum(waits) / len(waits), 4) if waits else 0.0,
+                "wait_p95_s": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else 0.0,
+                "wait_max_s": round(waits[-1], 4) if waits else 0.0,
+            }
+
+    def to_prometheus(self):
+        stats = self.stats()
+        lines = [
+            "# HELP llm_scheduler_queue_depth LLM requests waiting for admission.",
+            "# TYPE llm_scheduler_queue_depth gauge",
+            f"llm_scheduler_queue_depth {stats['queue_depth']}",
+            "# HELP llm_scheduler_active LLM requests in flight.",
+            "# TYPE llm_scheduler_active gauge",
+            f"llm_scheduler_active {stats['active']}",
+            "# HELP llm_scheduler_requests_total LLM requests by outcome.",
+            "# TYPE llm_scheduler_requests_total counter",
+        ]
+        lines += [f'llm_scheduler_requests_total{{outcome="{name}"}} {stats[name]}'
+                  for name in ("admitted", "completed", "retries", "failed")]
+        lines += [
+            "# HELP llm_scheduler_wait_seconds Time spent queued before admission (recent requests).",
+            "# TYPE llm_scheduler_wait_seconds gauge",
+            f'llm_scheduler_wait_seconds{{stat="avg"}} {stats["wait_avg_s"]}',
+            f'llm_scheduler_wait_seconds{{stat="p95"}} {stats["wait_p95_s"]}',
+            f'llm_scheduler_wait_seconds{{stat="max"}} {stats["wait_max_s"]}',
+        ]
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the whole process: every Streamlit session and batch worker goes through it
+llm_scheduler = LLMScheduler.from_env()
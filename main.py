@@ -1,45 +1,322 @@
-import pdfplumber
-import pandas as pd
-from openai import OpenAI
+import argparse
 import json
 import os
-import sys
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from ai_functions import *
-from populate_pptx import *
 
+# Before the imports below: they read their settings (LLM_*, ONE_PAGER_*) from the environment
+load_dotenv()
 
-# if len(sys.argv) < 2:
-#     print("Usage: python main.py <path_to_pdf>")
-#     sys.exit(1)
-# else:
-#     pdf_path = sys.argv[1]
-#     print(pdf_path)
+from cv_process_sort_gen import generate_one_pager, prepare_cv_text, save_intermediate
+from dedup_index import DEFAULT_THRESHOLD, DedupIndex, minhash_signature
+from populate_pptx import populate_pptx
+from deck_builder import build_deck
+from one_pager_io import EXTENSIONS, load_one_pager
+from instrumentation import export_jsonl, to_prometheus, track_run
+from llm_scheduler import BATCH, llm_scheduler, request_priority
 
-if __name__ == "__main__":
-    input_dir = "data/input_testing"
-    output_dir = "data/output"
+MANIFEST_NAME = "manifest.jsonl"
+DEDUP_INDEX_NAME = "dedup_index.sqlite"
+METRICS_JSONL_NAME = "metrics.jsonl"
+METRICS_PROM_NAME = "metrics.prom"
+
+
+def file_fingerprint(pdf_path):
+    """Size + mtime: a CV that is replaced by a new version is processed again."""
+    stat = os.stat(pdf_path)
+    return f"{stat.st_size}-{int(stat.st_mtime)}"
+
+
+def run_options(flavor, tower_selected, single_call, output_format):
+    """Options that change a CV's one-pager: a CV is only skipped on resume if they are the same."""
+    return {"flavor": flavor, "tower": tower_selected, "single_call": single_call, "format": output_format}
+
+
+def load_manifest(manifest_path):
+    """Return {file_name: record} for the CVs already finished (or flagged as duplicates) in previous runs."""
+    done = {}
+    if not os.path.exists(manifest_path):
+        return done
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line of an interrupted run may be cut in half
+                continue
+            if record.get("status") in ("done", "duplicate"):
+                done[record["file"]] = record
+    return done
+
+
+def append_manifest(manifest_path, record, lock):
+    with lock:
+        with open(manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _copy_if_exists(source, target):
+    if source and target and os.path.exists(source):
+        shutil.copyfile(source, target)
+        return target
+    return None
+
+
+def process_cv(pdf_path, output_dir, flavor=None, tower_selected=None, single_call=False, output_format="jsonl",
+               excel=False, dedup=None, dedup_mode="reuse"):
+    """
+    Extraction + LLM generation + PPTX rendering for one CV.
+    The one-pager rows are kept as <base>_one_pager.<jsonl|parquet> (output_format=None: not kept),
+    plus an .xlsx copy when excel=True.
+
+    dedup: DedupIndex of the CVs already processed. A near-duplicate of one of them is either
+    reused (dedup_mode="reuse": its one-pager files are copied, no LLM call, as long as it was
+    generated with the same run_options: tower, flavor, single_call and file format) or only
+    flagged (dedup_mode="flag": nothing is generated).
+    A CV with no match is reserved in the index before its generation, so a near-duplicate running
+    in another worker at the same time waits for it and reuses it (or is flagged).
+    """
+    file_name = os.path.basename(pdf_path)
+    base_name = os.path.splitext(file_name)[0]
+    data_path = os.path.join(output_dir, f"{base_name}_one_pager{EXTENSIONS[output_format]}") if output_format else None
+    excel_path = os.path.join(output_dir, f"{base_name}_one_pager.xlsx") if excel else None
+    pptx_path = os.path.join(output_dir, f"{base_name}_one_pager.pptx")
+
+    # Batch CVs queue behind the interactive (Streamlit) requests sharing the same API limits
+    with request_priority(BATCH), track_run(file=os.path.basename(pdf_path)) as run:
+        start = time.perf_counter()
+        cv_text = prepare_cv_text(pdf_path)
+        signature = minhash_signature(cv_text) if dedup is not None else None
+        options = run_options(flavor, tower_selected, single_call, output_format)
+        duplicate = None
+        while dedup is not None:
+            # The CV's own entry from an earlier run (--no-resume, updated file) is not a duplicate
+            matches = dedup.reserve(file_name, signature=signature, meta={"file": file_name})
+            # Preferably one done with the same options (reusable), else one still being generated
+            duplicate = (next((match for match in matches if match[2].get("options") == options), None)
+                         or next((match for match in matches if match[2].get("pending")), None)
+                         or (matches[0] if matches else None))
+            if duplicate is None or dedup_mode == "flag" or not duplicate[2].get("pending"):
+                break
+            # A near-duplicate is being generated by another worker right now: reuse it once done
+            dedup.wait(duplicate[0])
+        reserved = dedup is not None and duplicate is None
+        reusable = (
+            duplicate is not None
+            # Entries indexed before the options were stored are not reused
+            and duplicate[2].get("options") == options
+            and os.path.exists(duplicate[2].get("pptx") or "")
+        )
+
+        if duplicate is not None and dedup_mode == "flag":
+            return {"status": "duplicate", "duplicate_of": duplicate[2]["file"], "similarity": duplicate[1],
+                    "total_s": round(time.perf_counter() - start, 3), "_run": run}
+
+        if duplicate is not None and reusable:
+            # Same candidate already done with the same options: reuse its one-pager files as they are
+            data_path = _copy_if_exists(duplicate[2].get("one_pager"), data_path)
+            excel_path = _copy_if_exists(duplicate[2].get("excel"), excel_path)
+            shutil.copyfile(duplicate[2]["pptx"], pptx_path)
+            generated = finished = time.perf_counter()
+        else:
+            try:
+                one_pager = generate_one_pager(pdf_path, flavor, tower_selected, output_path=data_path,
+                                               single_call=single_call, cv_text=cv_text)
+                if excel_path:
+                    save_intermediate(one_pager, excel_path)
+                generated = time.perf_counter()
+                populate_pptx(one_pager, output_path=pptx_path)
+                finished = time.perf_counter()
+            except BaseException:
+                if reserved:
+                    dedup.release(file_name)
+                raise
+
+    totals = run.totals()
+    record = {
+        "one_pager": data_path,
+        "pptx": pptx_path,
+        "generate_s": round(generated - start, 3),
+        "render_s": round(finished - generated, 3),
+        "total_s": round(finished - start, 3),
+        "run_id": run.run_id,
+        "tokens": totals["prompt_tokens"] + totals["completion_tokens"],
+        "cost_usd": totals["cost_usd"],
+        "peak_rss_mb": round(run.peak_rss_mb, 1),
+        "_run": run,
+    }
+    if excel_path:
+        record["excel"] = excel_path
+    if duplicate is not None:
+        record["duplicate_of"] = duplicate[2]["file"]
+        record["similarity"] = duplicate[1]
+        record["reused"] = reusable
+    if dedup is not None and not reusable:
+        dedup.add(
+            file_name,
+            signature=signature,
+            meta={"file": file_name, "one_pager": data_path, "excel": excel_path,
+                  "pptx": pptx_path, "flavor": flavor, "tower": tower_selected, "options": options},
+        )
+    return record
+
+
+def run_batch(input_dir, output_dir, jobs=4, flavor=None, tower_selected=None, resume=True, single_call=False,
+              output_format="jsonl", excel=False, dedup_mode="reuse", dedup_threshold=DEFAULT_THRESHOLD):
+    """
+    Process every PDF in input_dir with a pool of `jobs` workers.
+
+    Each finished (or failed) CV is appended to output_dir/manifest.jsonl, so an interrupted
+    run started again with resume=True skips the CVs that already finished with the same file
+    and the same options (flavor, tower, single_call, output_format).
+
+    Near-duplicate CVs (re-exports, renamed copies, minor edits) are detected against
+    output_dir/dedup_index.sqlite, which persists between runs; dedup_mode is "reuse", "flag" or
+    "off" (see process_cv).
+    """
     os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    done = load_manifest(manifest_path) if resume else {}
+    lock = threading.Lock()
+    dedup = None
+    if dedup_mode != "off":
+        dedup = DedupIndex(os.path.join(output_dir, DEDUP_INDEX_NAME), threshold=dedup_threshold)
 
-for file_name in os.listdir(input_dir):
-    print(file_name)
-    if file_name.lower().endswith(".pdf"):
+    options = run_options(flavor, tower_selected, single_call, output_format)
+    pending = []
+    for file_name in sorted(os.listdir(input_dir)):
+        if not file_name.lower().endswith(".pdf"):
+            continue
         pdf_path = os.path.join(input_dir, file_name)
-        print(pdf_path)
-        output_path = os.path.join(output_dir, file_name.replace(".pdf", "_one_pager.xlsx"))
-        output_path = os.path.normpath(output_path)
-        
-        # 1. Generate the structured data (DataFrame)
-        # df = generate_one_pager(pdf_path, output_path)
-
-        # # Save intermediate Excel or CSV for inspection (optional)
-        # csv_path = os.path.join(output_dir, file_name.replace(".pdf", "_summary.csv"))
-        # df.to_csv(csv_path, index=False)
-        # print(f"✅ Summary saved at: {csv_path}")
-
-        df = pd.read_excel('data/output/CV_Sandra Popielarczyk_one_pager.xlsx')
-        # 2️. Generate PowerPoint
-        pptx_path = populate_pptx(df)
-        print(f"🎯 PowerPoint created: {pptx_path}")
-
-print("✅ All files processed successfully!")
\ No newline at end of file
+        previous = done.get(file_name)
+        # Records written before the options were stored don't match: those CVs are done again
+        if (previous and previous.get("fingerprint") == file_fingerprint(pdf_path)
+                and previous.get("options") == options):
+            print(f"⏭️  Skipping {file_name} (already in manifest)")
+            continue
+        pending.append(pdf_path)
+
+    print(f"🔹 {len(pending)} CVs to process, {len(done)} already done, {jobs} workers")
+    batch_start = time.perf_counter()
+    succeeded, failed = 0, 0
+    runs = []
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(process_cv, pdf_path, output_dir, flavor, tower_selected, single_call, output_format,
+                            excel, dedup, dedup_mode): pdf_path
+            for pdf_path in pending
+        }
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            file_name = os.path.basename(pdf_path)
+            record = {"file": file_name, "fingerprint": file_fingerprint(pdf_path), "options": options,
+                      "finished_at": time.time()}
+            try:
+                result = future.result()
+                run = result.pop("_run")
+                runs.append(run)
+                export_jsonl([run], os.path.join(output_dir, METRICS_JSONL_NAME))
+                record["status"] = "done"
+                record.update(result)
+                succeeded += 1
+                if record["status"] == "duplicate":
+                    print(f"🔁 {file_name}: near-duplicate of {record['duplicate_of']} "
+                          f"({record['similarity']:.0%} similar), not generated")
+                elif record.get("reused"):
+                    print(f"♻️  {file_name}: reused the one-pager of {record['duplicate_of']} "
+                          f"({record['similarity']:.0%} similar)")
+                else:
+                    print(f"✅ {file_name}: {record['total_s']:.1f}s "
+                          f"(generate {record['generate_s']:.1f}s, render {record['render_s']:.1f}s)")
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = str(e)
+                failed += 1
+                print(f"❌ {file_name}: {e}")
+            append_manifest(manifest_path, record, lock)
+
+            elapsed = time.perf_counter() - batch_start
+            print(f"   progress {succeeded + failed}/{len(pending)} — "
+                  f"{succeeded / elapsed * 60:.2f} CVs/minute")
+
+    elapsed = time.perf_counter() - batch_start
+    throughput = succeeded / elapsed * 60 if elapsed > 0 else 0.0
+    with open(os.path.join(output_dir, METRICS_PROM_NAME), "w", encoding="utf-8") as f:
+        f.write(to_prometheus(runs) + llm_scheduler.to_prometheus())
+    totals = [run.totals() for run in runs]
+    cost = sum(total["cost_usd"] for total in totals)
+    prompt_tokens = sum(total["prompt_tokens"] for total in totals)
+    cached_tokens = sum(total["cached_tokens"] for total in totals)
+    print(f"💰 Estimated LLM cost: ${cost:.4f} (per-stage metrics in {METRICS_JSONL_NAME} / {METRICS_PROM_NAME})")
+    if runs:
+        print(f"🔹 Peak memory (RSS) while processing: {max(run.peak_rss_mb for run in runs):.0f} MB")
+    if prompt_tokens:
+        print(f"♻️ Provider prompt cache: {cached_tokens} of {prompt_tokens} prompt tokens "
+              f"({cached_tokens / prompt_tokens:.0%})")
+    print(f"✅ Batch finished: {succeeded} done, {failed} failed in {elapsed:.1f}s ({throughput:.2f} CVs/minute)")
+    return {"succeeded": succeeded, "failed": failed, "elapsed_s": elapsed, "cvs_per_minute": throughput}
+
+
+def build_batch_deck(output_dir, deck_path):
+    """Merge every finished one-pager of the manifest into a single deck, one candidate at a time."""
+    manifest = load_manifest(os.path.join(output_dir, MANIFEST_NAME))
+    done = {file_name: record for file_name, record in manifest.items() if record["status"] == "done"}
+    # Older manifests only have the .xlsx; runs with --format none have nothing to reload
+    paths = [record.get("one_pager") or record.get("excel") for _, record in sorted(done.items())]
+    missing = paths.count(None)
+    if missing:
+        print(f"⚠️ {missing} one-pagers were not kept on disk (--format none) and are left out of the deck")
+    one_pagers = (load_one_pager(path) for path in paths if path)
+    build_deck(one_pagers, output_path=deck_path)
+    print(f"🎯 Combined deck created: {deck_path}")
+    return deck_path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate one-pagers for every CV in a directory.")
+    parser.add_argument("--input-dir", default="data/input_testing")
+    parser.add_argument("--output-dir", default="data/output")
+    parser.add_argument("--jobs", type=int, default=4, help="Number of CVs processed in parallel")
+    parser.add_argument("--flavor", default=None, help="Optional role flavor (DA, DE, DS, SE)")
+    parser.add_argument("--tower", default=None, help="Tower prompt; auto-detected when omitted")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the manifest and redo every CV")
+    parser.add_argument("--single-call", action="store_true",
+                        help="One structured-output LLM call per CV instead of flavor + sections + roles")
+    parser.add_argument("--format", default="jsonl", choices=["jsonl", "parquet", "none"],
+                        help="File kept with the one-pager rows (used by --deck); parquet needs pyarrow")
+    parser.add_argument("--excel", action="store_true", help="Also export each one-pager as .xlsx")
+    parser.add_argument("--deck", default=None, help="Also merge all one-pagers into this single .pptx")
+    parser.add_argument("--dedup", default="reuse", choices=["reuse", "flag", "off"],
+                        help="What to do with near-duplicate CVs: reuse the earlier one-pager, only flag them, "
+                             "or process everything")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Estimated text similarity (0-1) above which two CVs are duplicates")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_batch(
+        args.input_dir,
+        args.output_dir,
+        jobs=args.jobs,
+        flavor=args.flavor,
+        tower_selected=args.tower,
+        resume=not args.no_resume,
+        single_call=args.single_call,
+        output_format=None if args.format == "none" else args.format,
+        excel=args.excel,
+        dedup_mode=args.dedup,
+        dedup_threshold=args.dedup_threshold,
+    )
+    if args.deck:
+        build_batch_deck(args.output_dir, args.deck)
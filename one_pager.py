@@ -0,0 +1,134 @@
+import json
+import re
+from dataclasses import dataclass, field
+
+# Section names as the tower prompts write them -> OnePager field
+SECTION_FIELDS = {
+    "NAME": "name",
+    "TOWER": "tower",
+    "PROFILE OVERVIEW": "profile_overview",
+    "PROFESSIONAL EDUCATION": "professional_education",
+    "INDUSTRY EXPERIENCE": "industry_experience",
+    "FUNCTIONAL EXPERIENCE": "functional_experience",
+    "CERTIFICATIONS/TRAINING": "certifications_training",
+    "LANGUAGES": "languages",
+}
+ROLE_PREFIX = "Role_"
+COLUMNS = ["section_name", "output"]
+
+
+def tower_id(tower):
+    """Comparable form of a tower name: the TOWER the model writes ('CONTROL TOWER') ~ the prompt file ('Control_Tower')."""
+    return re.sub(r"[^a-z0-9]", "", (tower or "").lower())
+
+
+@dataclass(slots=True)
+class OnePager:
+    """
+    Result of generate_one_pager: one field per section (None = not generated, the template
+    keeps its placeholder) and the list of roles, rendered as Role_1, Role_2...
+
+    Sections the prompts don't list are kept by name in `extra`, so nothing the model returned
+    is lost. The two-column DataFrame of earlier versions is still available through
+    to_dataframe() / from_dataframe() (Streamlit preview, old notebooks).
+    """
+
+    name: str | None = None
+    tower: str | None = None
+    profile_overview: str | None = None
+    professional_education: str | None = None
+    industry_experience: str | None = None
+    functional_experience: str | None = None
+    certifications_training: str | None = None
+    languages: str | None = None
+    roles: list[str] = field(default_factory=list)
+    extra: dict[str, str] = field(default_factory=dict)
+
+    # ---------- building ----------
+    @classmethod
+    def from_sections(cls, sections, roles=()):
+        """Sections dict (as parsed from the SECTIONS answer) + roles list."""
+        one_pager = cls(roles=[str(role) for role in roles])
+        for section_name, text in sections.items():
+            field_name = SECTION_FIELDS.get(section_name.strip().upper())
+            if field_name is None:
+                one_pager.extra[section_name] = str(text)
+            else:
+                setattr(one_pager, field_name, str(text))
+        return one_pager
+
+    @classmethod
+    def from_rows(cls, rows):
+        """(section_name, output) rows, roles as Role_<n> rows (the layout of the DataFrame / jsonl files)."""
+        sections, roles = {}, []
+        for section_name, output in rows:
+            if section_name.startswith(ROLE_PREFIX):
+                roles.append(output)
+            else:
+                sections[section_name] = output
+        return cls.from_sections(sections, roles)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls.from_sections(data.get("sections", {}), data.get("roles", ()))
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def from_dataframe(cls, df):
+        # Empty cells of an .xlsx come back as NaN
+        return cls.from_rows(zip(df["section_name"].astype(str), df["output"].fillna("").astype(str)))
+
+    # ---------- reading ----------
+    def sections(self):
+        """{section name: text} of the generated sections, in slide order, then the extra ones."""
+        sections = {}
+        for section_name, field_name in SECTION_FIELDS.items():
+            text = getattr(self, field_name)
+            if text is not None:
+                sections[section_name] = text
+        sections.update(self.extra)
+        return sections
+
+    def rows(self):
+        """[(section_name, output)] with the roles last, as Role_1, Role_2..."""
+        rows = list(self.sections().items())
+        rows += [(f"{ROLE_PREFIX}{i + 1}", role) for i, role in enumerate(self.roles)]
+        return rows
+
+    def get(self, section_name):
+        """Text of a section or role by name (case-insensitive, e.g. 'profile overview', 'role_2'), or None."""
+        key = section_name.strip().upper()
+        field_name = SECTION_FIELDS.get(key)
+        if field_name is not None:
+            return getattr(self, field_name)
+        if key.startswith(ROLE_PREFIX.upper()) and key[len(ROLE_PREFIX):].isdigit():
+            position = int(key[len(ROLE_PREFIX):]) - 1
+            return self.roles[position] if 0 <= position < len(self.roles) else None
+        for extra_name, text in self.extra.items():
+            if extra_name.strip().upper() == key:
+                return text
+        return None
+
+    def to_dict(self):
+        return {"sections": self.sections(), "roles": list(self.roles)}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def to_dataframe(self):
+        """Two-column section_name / output DataFrame (Streamlit preview, parquet / excel files)."""
+        import pandas as pd
+
+        return pd.DataFrame(self.rows(), columns=COLUMNS)
+
+
+def as_one_pager(value):
+    """OnePager from a OnePager, a section_name / output DataFrame or a list of rows."""
+    if isinstance(value, OnePager):
+        return value
+    if hasattr(value, "columns"):
+        return OnePager.from_dataframe(value)
+    return OnePager.from_rows(value)
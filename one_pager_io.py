@@ -0,0 +1,55 @@
+import json
+import os
+
+from one_pager import COLUMNS, OnePager
+
+# Intermediate one-pager file (section_name / output rows) between generation and rendering.
+# The format is picked from the extension unless given explicitly.
+FORMATS = {".jsonl": "jsonl", ".parquet": "parquet", ".xlsx": "excel"}
+EXTENSIONS = {fmt: extension for extension, fmt in FORMATS.items()}
+
+
+def detect_format(path, fmt=None):
+    if fmt is not None:
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unknown one-pager format {fmt!r}, expected one of {sorted(EXTENSIONS)}")
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Can't tell the one-pager format of {path!r}, use one of {sorted(FORMATS)}")
+    return FORMATS[extension]
+
+
+def save_one_pager(one_pager, path, fmt=None):
+    """
+    Writes the OnePager to path, one section_name / output row per section and role.
+    jsonl (default choice for batch runs) only needs the json module; parquet needs pyarrow;
+    excel goes through openpyxl and is meant for people who want to open the file.
+    """
+    fmt = detect_format(path, fmt)
+    if fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for section_name, output in one_pager.rows():
+                f.write(json.dumps({"section_name": section_name, "output": output}, ensure_ascii=False) + "\n")
+    elif fmt == "parquet":
+        try:
+            one_pager.to_dataframe().to_parquet(path, index=False)
+        except ImportError as e:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+    else:
+        one_pager.to_dataframe().to_excel(path, index=False)
+    return path
+
+
+def load_one_pager(path, fmt=None):
+    """Reads a file written by save_one_pager (or an older *_one_pager.xlsx) back into a OnePager."""
+    fmt = detect_format(path, fmt)
+    if fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return OnePager.from_rows((row["section_name"], row["output"]) for row in rows)
+
+    import pandas as pd
+
+    df = pd.read_parquet(path) if fmt == "parquet" else pd.read_excel(path)
+    return OnePager.from_dataframe(df[COLUMNS])
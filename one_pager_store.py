@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from one_pager import OnePager, tower_id
+
+DEFAULT_STORE_PATH = os.getenv("ONE_PAGER_STORE_PATH", ".cache/one_pagers.sqlite")
+
+_TERM_RE = re.compile(r"\w+")
+_RESULT_COLUMNS = "p.id, p.candidate_name, p.tower, p.flavor, p.source_file, p.created_at"
+
+
+def fts_query(text):
+    """
+    Free text typed by a recruiter -> FTS5 query: every word must appear, the last one as a prefix
+    (still being typed), e.g. 'spark databr' -> '"spark" "databr"*'. FTS5 syntax characters are ignored.
+    Only the last word is a prefix: a short prefix expands to every indexed term it starts.
+    """
+    terms = [f'"{term}"' for term in _TERM_RE.findall(text.lower())]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class OnePagerStore:
+    """
+    Every generated one-pager (candidate name, tower, flavor, sections and roles) in one SQLite
+    file, with an FTS5 index over the names and section outputs for the search page.
+
+    Identical one-pagers (same rows, tower and flavor) are stored once. A stored one-pager can
+    be rendered again to PPTX without any LLM call. Towers are matched on tower_id, so a filter on
+    'Control_Tower' also finds the one-pagers whose tower was detected as 'CONTROL TOWER'.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        if self.enabled:
+            self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS one_pagers (
+                       id INTEGER PRIMARY KEY,
+                       content_hash TEXT NOT NULL UNIQUE,
+                       candidate_name TEXT,
+                       tower TEXT,
+                       tower_key TEXT,
+                       flavor TEXT,
+                       source_file TEXT,
+                       sections TEXT NOT NULL,
+                       roles TEXT NOT NULL,
+                       created_at REAL NOT NULL
+                   )"""
+            )
+            if "tower_key" not in {row[1] for row in conn.execute("PRAGMA table_info(one_pagers)")}:
+                # Stores created before tower_key: add it, filled from the stored tower
+                conn.execute("ALTER TABLE one_pagers ADD COLUMN tower_key TEXT")
+                conn.executemany(
+                    "UPDATE one_pagers SET tower_key = ? WHERE id = ?",
+                    [(tower_id(tower) or None, one_pager_id)
+                     for one_pager_id, tower in conn.execute("SELECT id, tower FROM one_pagers").fetchall()],
+                )
+            conn.execute("DROP INDEX IF EXISTS idx_one_pagers_tower")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_one_pagers_tower_key ON one_pagers(tower_key, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_one_pagers_created ON one_pagers(created_at)")
+            # Name weighs more than the body in the ranking (see search)
+            conn.execute(
+                """CREATE VIRTUAL TABLE IF NOT EXISTS one_pagers_fts USING fts5(
+                       candidate_name, body, tokenize = 'unicode61 remove_diacritics 2'
+                   )"""
+            )
+
+    # ---------- write ----------
+    def save(self, one_pager, tower=None, flavor=None, source_file=None):
+        """Stores a generate_one_pager result; returns its id (the existing one if already stored)."""
+        if not self.enabled:
+            return None
+        return self.save_many([(one_pager, tower, flavor, source_file)])[0]
+
+    def save_many(self, items):
+        """Bulk save of (one_pager, tower, flavor, source_file) in one transaction, e.g. to backfill the store."""
+        ids = []
+        now = time.time()
+        with self._connect() as conn:
+            for one_pager, tower, flavor, source_file in items:
+                ids.append(self._insert(conn, one_pager, tower, flavor, source_file, now))
+        return ids
+
+    def _insert(self, conn, one_pager, tower, flavor, source_file, created_at):
+        sections, roles = one_pager.sections(), one_pager.roles
+        content_hash = hashlib.sha256(
+            json.dumps([one_pager.rows(), tower, flavor], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        candidate_name = (one_pager.name or "").strip()
+
+        cursor = conn.execute(
+            """INSERT OR IGNORE INTO one_pagers
+                   (content_hash, candidate_name, tower, tower_key, flavor, source_file, sections, roles, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (content_hash, candidate_name, tower, tower_id(tower) or None, flavor, source_file,
+             json.dumps(sections, ensure_ascii=False), json.dumps(roles, ensure_ascii=False), created_at),
+        )
+        if cursor.rowcount == 0:
+            (one_pager_id,) = conn.execute(
+                "SELECT id FROM one_pagers WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            return one_pager_id
+        # ** markup is kept out of the index so 'SQL' matches '**SQL**'
+        body = "\n".join(list(sections.values()) + roles).replace("**", "")
+        conn.execute(
+            "INSERT INTO one_pagers_fts (rowid, candidate_name, body) VALUES (?, ?, ?)",
+            (cursor.lastrowid, candidate_name, body),
+        )
+        return cursor.lastrowid
+
+    def delete(self, one_pager_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM one_pagers WHERE id = ?", (one_pager_id,))
+            conn.execute("DELETE FROM one_pagers_fts WHERE rowid = ?", (one_pager_id,))
+
+    # ---------- read ----------
+    def search(self, text="", tower=None, flavor=None, limit=20, offset=0):
+        """
+        One-pagers matching every word of `text` (all of them if empty), best matches first
+        (bm25, name matches weighted 5x), optionally filtered by tower / flavor.
+        Returns dicts with id, candidate_name, tower, flavor, source_file, created_at and a snippet.
+        """
+        filters, params = [], []
+        if tower:
+            filters.append("p.tower_key = ?")
+            params.append(tower_id(tower))
+        if flavor:
+            filters.append("p.flavor = ?")
+            params.append(flavor)
+        query = fts_query(text)
+
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            if not query:
+                return [dict(row, snippet="") for row in conn.execute(
+                    f"""SELECT {_RESULT_COLUMNS} FROM one_pagers p
+                        {'WHERE ' + ' AND '.join(filters) if filters else ''}
+                        ORDER BY p.created_at DESC LIMIT ? OFFSET ?""",
+                    params + [limit, offset],
+                )]
+
+            # Ranking first, on ids only: SQLite evaluates every selected column (snippet, joined
+            # columns) of every match before sorting, which dominates with common terms
+            if filters:
+                ranked = conn.execute(
+                    f"""SELECT p.id FROM one_pagers_fts JOIN one_pagers p ON p.id = one_pagers_fts.rowid
+                        WHERE one_pagers_fts MATCH ? AND {' AND '.join(filters)}
+                        ORDER BY bm25(one_pagers_fts, 5.0, 1.0) LIMIT ? OFFSET ?""",
+                    [query] + params + [limit, offset],
+                ).fetchall()
+            else:
+                ranked = conn.execute(
+                    """SELECT rowid FROM one_pagers_fts WHERE one_pagers_fts MATCH ?
+                       ORDER BY bm25(one_pagers_fts, 5.0, 1.0) LIMIT ? OFFSET ?""",
+                    (query, limit, offset),
+                ).fetchall()
+
+            return [dict(conn.execute(
+                f"""SELECT {_RESULT_COLUMNS}, snippet(one_pagers_fts, 1, '**', '**', ' … ', 16) AS snippet
+                    FROM one_pagers_fts JOIN one_pagers p ON p.id = one_pagers_fts.rowid
+                    WHERE one_pagers_fts MATCH ? AND one_pagers_fts.rowid = ?""",
+                (query, one_pager_id),
+            ).fetchone()) for (one_pager_id,) in ranked]
+
+    def get(self, one_pager_id):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM one_pagers WHERE id = ?", (one_pager_id,)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["sections"] = json.loads(record["sections"])
+        record["roles"] = json.loads(record["roles"])
+        return record
+
+    def load(self, one_pager_id):
+        """The stored one-pager as the OnePager generate_one_pager returned."""
+        record = self.get(one_pager_id)
+        return OnePager.from_sections(record["sections"], record["roles"])
+
+    def render(self, one_pager_id):
+        """PPTX bytes of a stored one-pager, rendered from the stored text (no LLM call)."""
+        from populate_pptx import render_pptx
+
+        return render_pptx(self.load(one_pager_id)).getvalue()
+
+    def towers(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT tower FROM one_pagers WHERE tower IS NOT NULL ORDER BY tower"
+            )]
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM one_pagers").fetchone()[0]
+
+
+_one_pager_store = None
+_one_pager_store_lock = threading.Lock()
+
+
+def get_one_pager_store():
+    """Process-wide OnePagerStore, created (with its SQLite file) on first use, not on import."""
+    global _one_pager_store
+    with _one_pager_store_lock:
+        if _one_pager_store is None:
+            _one_pager_store = OnePagerStore(
+                enabled=os.getenv("ONE_PAGER_STORE_DISABLED", "").lower() not in ("1", "true", "yes")
+            )
+        return _one_pager_store
@@ -0,0 +1,54 @@
+import streamlit as st
+
+from one_pager_store import get_one_pager_store
+from resources import load_tower_flavor
+
+# --------------------
+# Search page over every one-pager generated so far (see one_pager_store)
+# Re-rendering a stored one-pager only fills the template: no LLM call.
+# --------------------
+st.set_page_config(page_title="Search One-Pagers", page_icon="🔎")
+st.markdown("### 🔎 Search One-Pagers")
+
+one_pager_store = get_one_pager_store()
+
+if not one_pager_store.enabled:
+    st.warning("The one-pager store is disabled (ONE_PAGER_STORE_DISABLED).")
+    st.stop()
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    text = st.text_input("Skills, technologies, companies, names...", placeholder="e.g. databricks spark")
+with col2:
+    tower = st.selectbox("Tower", ["All"] + list(load_tower_flavor().keys()))
+
+results = one_pager_store.search(text, tower=None if tower == "All" else tower, limit=50)
+st.caption(f"{len(results)} result(s) · {len(one_pager_store)} one-pagers stored")
+
+for result in results:
+    title = f"{result['candidate_name'] or 'Unnamed'} · {result['tower']} · {result['flavor'] or 'no flavor'}"
+    with st.expander(title):
+        if result["snippet"]:
+            st.markdown(result["snippet"].replace("\n", " "))
+        st.caption(f"📄 {result['source_file'] or 'unknown file'} · #{result['id']}")
+
+        record = one_pager_store.get(result["id"])
+        for section_name, output in record["sections"].items():
+            st.markdown(f"**{section_name}**: {output}")
+        for role in record["roles"]:
+            st.markdown(f"- {role}")
+
+        # Only the last prepared deck (~3 MB) is kept in the session, not one per result
+        stored_pptx = st.session_state.get("stored_pptx")
+        if stored_pptx is None or stored_pptx[0] != result["id"]:
+            if st.button("🖨️ Prepare PPTX", key=f"render_{result['id']}"):
+                st.session_state["stored_pptx"] = (result["id"], one_pager_store.render(result["id"]))
+                st.rerun()
+        else:
+            st.download_button(
+                label="📊 Download OnePager",
+                data=stored_pptx[1],
+                file_name=f"OnePager_{result['id']}.pptx",
+                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                key=f"download_{result['id']}",
+            )
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import cv_process_sort_gen as cv
+from cv_compaction import DEFAULT_TOKEN_BUDGET
+from ingest_guard import sha256_of
+from instrumentation import current_run, track_run
+from llm_cache import file_fingerprint
+from prefetch import SpeculationCancelled, tower_matches
+
+# One-pager pipeline as explicit stages, each memoized on a hash of its inputs:
+#
+#   extract (PDF bytes, compaction) -> flavor (CV text, role file) -> sections (text, tower prompt)
+#                                                                  \-> roles (text)  -> render (rows, template)
+#
+# Trying another tower only re-runs sections + render, another flavor reuses the extracted
+# text, and a template change only re-renders (no LLM call). prefetch.py fills extract and the
+# default.md sections while the user is still choosing the tower. The app's jobs run
+# stream_one_pager; the batch CLI calls cv_process_sort_gen.generate_one_pager directly.
+
+# Max entries kept per stage; rendered decks are ~3 MB (template images) so only a few are kept
+MEMO_ENTRIES = {"extract": 64, "flavor": 128, "sections": 256, "roles": 128, "render": 8}
+
+
+# Already set: returned by _claim when the value is in the memo
+_AVAILABLE = threading.Event()
+_AVAILABLE.set()
+
+
+def input_hash(*parts):
+    """sha256 of the JSON-encoded inputs of a stage (bytes are hashed first)."""
+    encoded = [hashlib.sha256(part).hexdigest() if isinstance(part, bytes) else part for part in parts]
+    return hashlib.sha256(json.dumps(encoded, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class StageMemo:
+    """
+    In-process LRU of stage outputs, one per stage name, with hit/miss counters.
+    get_or_compute is single-flight: callers asking for a key that is being computed wait for it.
+    None means "not in the memo", so a stage that returns None is not stored (it runs again).
+    """
+
+    def __init__(self, entries=MEMO_ENTRIES):
+        self.entries = dict(entries)
+        self._memo = {name: OrderedDict() for name in self.entries}
+        self._counters = {name: {"hits": 0, "misses": 0} for name in self.entries}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, stage_name, key):
+        with self._lock:
+            memo = self._memo[stage_name]
+            if key in memo:
+                memo.move_to_end(key)
+                self._counters[stage_name]["hits"] += 1
+                value = memo[key]
+            else:
+                self._counters[stage_name]["misses"] += 1
+                return None
+        run = current_run()
+        if run is not None:
+            run.metadata.setdefault("reused_stages", []).append(stage_name)
+        return value
+
+    def set(self, stage_name, key, value):
+        if value is None:
+            return
+        with self._lock:
+            memo = self._memo[stage_name]
+            memo[key] = value
+            memo.move_to_end(key)
+            while len(memo) > self.entries[stage_name]:
+                memo.popitem(last=False)
+
+    def _claim(self, stage_name, key):
+        """None if the caller has to compute the value, else an Event set once it is available."""
+        with self._lock:
+            if key in self._memo[stage_name]:
+                return _AVAILABLE
+            pending = self._inflight.get((stage_name, key))
+            if pending is None:
+                self._inflight[(stage_name, key)] = threading.Event()
+            return pending
+
+    def get_or_compute(self, stage_name, key, compute):
+        while True:
+            value = self.get(stage_name, key)
+            if value is not None:
+                return value
+            pending = self._claim(stage_name, key)
+            if pending is None:
+                break
+            # Being computed by another thread: its value, or our turn if it failed
+            pending.wait()
+        try:
+            value = compute()
+            self.set(stage_name, key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop((stage_name, key)).set()
+
+    def wait(self, stage_name, key):
+        """
+        Value of key once the computation in flight (if any) is over; None if not computed or failed.
+        Not counted as a hit or a miss.
+        """
+        with self._lock:
+            pending = self._inflight.get((stage_name, key))
+        if pending is not None:
+            pending.wait()
+        with self._lock:
+            return self._memo[stage_name].get(key)
+
+    def discard(self, stage_name, key):
+        with self._lock:
+            self._memo[stage_name].pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            for memo in self._memo.values():
+                memo.clear()
+
+    def stats(self):
+        with self._lock:
+            return {name: {**counters, "entries": len(self._memo[name])} for name, counters in self._counters.items()}
+
+
+stage_memo = StageMemo()
+
+
+def _template_stamp():
+    from populate_pptx import TEMPLATE_PATH
+
+    stat = os.stat(TEMPLATE_PATH)
+    return [TEMPLATE_PATH, stat.st_mtime_ns, stat.st_size]
+
+
+# ---------- Stages ----------
+
+def extract_stage(cv_path, compact=True, token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    PDF -> CV text sent to the LLM, keyed on the file contents (not its name). The file is hashed
+    and parsed from where it is (path or file object), never copied whole into memory.
+    """
+    key = input_hash("extract", sha256_of(cv_path), compact, token_budget)
+    return stage_memo.get_or_compute(
+        "extract", key, lambda: cv.prepare_cv_text(cv_path, compact=compact, token_budget=token_budget)
+    )
+
+
+def flavor_stage(cv_text, flavor):
+    if flavor is None:
+        return cv_text
+    key = input_hash("flavor", cv.MODEL, cv_text, flavor, file_fingerprint(f"roles/{flavor}.md"))
+    return stage_memo.get_or_compute("flavor", key, lambda: cv.add_flavor(cv_text, flavor))
+
+
+def _sections_key(cv_text, tower_selected):
+    return input_hash("sections", cv.MODEL, cv_text, tower_selected,
+                      file_fingerprint(cv.tower_prompt_path(tower_selected)))
+
+
+def _roles_key(cv_text):
+    return input_hash("roles", cv.MODEL, cv.ROLES_INSTRUCTIONS, cv_text)
+
+
+def prefetch_sections_stage(cv_text, cancelled, on_section=None):
+    """
+    Speculative default.md SECTIONS call (the memo entry stream_sections_stage(cv_text, None) reads),
+    run by prefetch.py on upload. Streamed so that it stops (SpeculationCancelled, stream closed) as
+    soon as `cancelled` is set; on_section(name, text) sees each section as it arrives.
+    """
+    def compute():
+        sections = cv.stream_sections(cv_text, None)
+        try:
+            for name, text in sections:
+                if cancelled.is_set():
+                    raise SpeculationCancelled()
+                if name == "__raw__":
+                    # An answer that doesn't parse is not kept (see _parses)
+                    return text if _parses(text) else None
+                if on_section is not None:
+                    on_section(name, text)
+        finally:
+            sections.close()
+
+    return stage_memo.get_or_compute("sections", _sections_key(cv_text, None), compute)
+
+
+def _parses(raw):
+    try:
+        cv.parse_sections_json(raw)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def prefetched_sections(cv_text, tower_selected):
+    """
+    The default.md SECTIONS answer prefetched for this CV text, if the tower it detected is
+    tower_selected (waits for it while it is still streaming); None otherwise.
+    Not used without a tower: that is the same memo key, already looked up by the caller.
+    """
+    if tower_selected is None:
+        return None
+    raw = stage_memo.wait("sections", _sections_key(cv_text, None))
+    if raw is None:
+        return None
+    try:
+        detected_tower = cv.parse_sections_json(raw).get("TOWER")
+    except (TypeError, ValueError, AttributeError):
+        return None
+    if not tower_matches(detected_tower, tower_selected):
+        return None
+    run = current_run()
+    if run is not None:
+        run.metadata.setdefault("reused_stages", []).append("sections (prefetched)")
+    return raw
+
+
+def stream_sections_stage(cv_text, tower_selected):
+    """Memoized cv.stream_sections: a hit is replayed section by section."""
+    key = _sections_key(cv_text, tower_selected)
+    raw = stage_memo.get("sections", key)
+    if raw is None:
+        raw = prefetched_sections(cv_text, tower_selected)
+        if raw is not None:
+            stage_memo.set("sections", key, raw)
+    if raw is not None:
+        # Parsed before anything is yielded: a malformed stored answer raises, like a live one
+        # would, and is dropped so the next try calls the model again
+        try:
+            sections = cv.parse_sections_json(raw)
+        except (TypeError, ValueError):
+            stage_memo.discard("sections", key)
+            raise
+        yield from sections.items()
+        yield "__raw__", raw
+        return
+    for name, text in cv.stream_sections(cv_text, tower_selected):
+        if name == "__raw__" and _parses(text):
+            stage_memo.set("sections", key, text)
+        yield name, text
+
+
+def stream_roles_stage(cv_text):
+    """Memoized cv.stream_roles."""
+    key = _roles_key(cv_text)
+    roles = stage_memo.get("roles", key)
+    if roles is not None:
+        yield from roles
+        return
+    roles = []
+    for role in cv.stream_roles(cv_text):
+        roles.append(role)
+        yield role
+    stage_memo.set("roles", key, roles)
+
+
+def render_stage(one_pager):
+    """PPTX bytes for a OnePager, keyed on its rows and on the template file (no LLM involved)."""
+    from populate_pptx import render_pptx
+
+    key = input_hash("render", one_pager.rows(), _template_stamp())
+    return stage_memo.get_or_compute("render", key, lambda: render_pptx(one_pager).getvalue())
+
+
+# ---------- Pipelines ----------
+
+def stream_one_pager(cv_path, flavor, tower_selected, compact=True, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Memoized generate_one_pager_stream: same events, stages already computed are replayed."""
+    with track_run(flavor=flavor, tower=tower_selected, mode="stages"):
+        cv_text = flavor_stage(extract_stage(cv_path, compact, token_budget), flavor)
+        for event in cv.stream_sections_and_roles(
+            cv_text, tower_selected, sections_source=stream_sections_stage, roles_source=stream_roles_stage
+        ):
+            if event[0] == "done":
+                cv.store_one_pager(event[1], cv_path, flavor, tower_selected)
+            yield event
@@ -1,102 +1,187 @@
 from pptx import Presentation
 from pptx.util import Pt
 from pptx.dml.color import RGBColor
-import pandas as pd
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.text.text import _Run
+import copy
+import functools
+import io
+import os
 import re
+import threading
+from instrumentation import stage
+from one_pager import as_one_pager
 
-def apply_bold_to_paragraph(paragraph):
+TEMPLATE_PATH = 'data/input/SC&O OP VACIO - TEMPLATE 3 - New.pptx'
+
+# Plantilla parseada una sola vez por proceso: {path: (file stamp, Presentation, shape index)}
+_template_cache = {}
+_template_lock = threading.Lock()
+
+def build_shape_index(slide):
+    """
+    Map each normalized shape name (strip + lower) to the positions of the text shapes with
+    that name, so a section is found with a dict lookup instead of scanning every shape.
+    """
+    index = {}
+    for position, shape in enumerate(slide.shapes):
+        if shape.has_text_frame:
+            index.setdefault(shape.name.strip().lower(), []).append(position)
+    return index
+
+def load_template(template_path=TEMPLATE_PATH):
+    """
+    Return a fresh in-memory copy of the template and the section-name -> shape index.
+
+    The .pptx is parsed only the first time (and again if the file changes on disk);
+    later calls deep-copy the already parsed presentation.
+
+    Ojo: the cached template must never be accessed through slides/shapes. python-pptx caches
+    proxy objects that point at inner XML elements, and deepcopy would detach them from the
+    copied tree, so the index is built on a copy instead.
     """
-    Applies bold formatting to words enclosed between ** iterating over each part of each pptx text_frame.paragraphs.
+    stat = os.stat(template_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _template_lock:
+        cached = _template_cache.get(template_path)
+        if cached is None or cached[0] != stamp:
+            template = Presentation(template_path)
+            shape_index = build_shape_index(copy.deepcopy(template).slides[0])
+            cached = (stamp, template, shape_index)
+            _template_cache[template_path] = cached
+        _, template, shape_index = cached
+        return copy.deepcopy(template), shape_index
+
+# **bold** spans; (.*?) so that an empty '****' is consumed too. A '**' left without a partner
+# (unbalanced markup from the model) is dropped instead of ending up in the slide.
+_BOLD_RE = re.compile(r"\*\*(.*?)\*\*", re.DOTALL)
+
+# Sections where bullets should be applied
+BULLET_SECTIONS = {"industry experience", "functional experience", "certifications/training"}
+
+# (font, size, color) per section; everything else uses the default Graphik 9 black
+HEADER_STYLES = {
+    "name": ("Graphik Black", 42, RGBColor(255, 255, 255)),
+    "tower": ("Graphik Black", 24, RGBColor(255, 255, 255)),
+}
+DEFAULT_STYLE = ("Graphik", 9, RGBColor(0, 0, 0))
+
+def parse_bold_markup(text):
+    """
+    Splits a line with **bold** markup into (text, bold) segments, skipping empty ones.
 
     Example:
-    paragraph = 'Responsible for **collecting** and **analyzing** data.'
-    parts = ['Responsible for ','**collecting**',' and' ,'**analyzing**',' data']
-    part = '**analyzing**'
-    result = analyzing in bold
+    'Responsible for **collecting** and **analyzing** data.'
+    -> [('Responsible for ', False), ('collecting', True), (' and ', False), ('analyzing', True), (' data.', False)]
     """
-    text = paragraph.text
-    parts = re.split(r'(\*\*.*?\*\*)', text)
-
-    # Remove existing runs
-    for _ in range(len(paragraph.runs)):
-        paragraph._element.remove(paragraph.runs[0]._r)
-        
-    # Rebuild runs with bold formatting
-    for part in parts:
-        run = paragraph.add_run()
-        if part.startswith("**") and part.endswith("**"):
-            run.text = part[2:-2]  # remove ** markers
-            run.font.bold = True
-        else:
-            run.text = part
-
-def populate_pptx(df_text):
+    segments = []
+    position = 0
+    for match in _BOLD_RE.finditer(text):
+        plain = text[position:match.start()]
+        if plain:
+            segments.append((plain, False))
+        if match.group(1):
+            segments.append((match.group(1), True))
+        position = match.end()
+    rest = text[position:].replace("**", "")
+    if rest:
+        segments.append((rest, False))
+    return segments
+
+@functools.lru_cache(maxsize=None)
+def _run_properties(style, bold):
+    """<a:rPr> for a style, built once through the python-pptx font API and then copied per run."""
+    font_name, size, color = style
+    run = _Run(parse_xml(f'<a:r {nsdecls("a")}><a:t/></a:r>'), None)
+    if bold:
+        run.font.bold = True
+    run.font.name = font_name
+    run.font.size = Pt(size)
+    run.font.color.rgb = color
+    return run._r.rPr
+
+def _add_styled_run(p, text, style, bold=False):
+    r = p.add_r()
+    r.insert(0, copy.deepcopy(_run_properties(style, bold)))
+    r.text = text
+
+def format_section_lines(section_name, text):
+    """Lines of a section as they go on the slide, with the role title in bold and the bullets."""
+    lines = text.splitlines()
+    if section_name.startswith("role") and lines:
+        # Keep title without bullet and make it bold
+        return [f"**{lines[0].strip()}**"] + [f"• {line}" for line in lines[1:]]
+    if section_name in BULLET_SECTIONS:
+        # An empty section still needs one (empty) paragraph: a txBody without <a:p> is invalid
+        return [f"• {line}" for line in lines] or [""]
+    # No bullets for other sections
+    return lines or [""]
+
+def write_section(text_frame, section_name, text):
+    """
+    Replaces the text of a shape in one pass: each line becomes a paragraph whose runs are created
+    already split on the bold markup and styled (NAME / TOWER headers, Graphik 9 for the rest).
+    """
+    txBody = text_frame._txBody
+    txBody.clear_content()
+    header_style = HEADER_STYLES.get(section_name)
+    for line in format_section_lines(section_name, text):
+        p = txBody.add_p()
+        if header_style is not None:
+            # NAME / TOWER: a single upper-case run, markup removed
+            plain = "".join(segment for segment, _ in parse_bold_markup(line)).upper().strip()
+            _add_styled_run(p, plain, header_style)
+            continue
+        segments = parse_bold_markup(line)
+        # An empty line keeps one empty run so the blank line has the 9pt height
+        for segment, bold in segments or [("", False)]:
+            _add_styled_run(p, segment, DEFAULT_STYLE, bold)
+
+def fill_slide(slide, one_pager, shape_index):
+    """
+    Writes each section / role of the OnePager into the matching shape of `slide` (a copy of the
+    template slide). shape_index is the section-name -> shape positions map returned by
+    load_template; shapes without a generated section keep the template text.
+    A section_name / output DataFrame is accepted too.
+    """
+    one_pager = as_one_pager(one_pager)
+    shapes = list(slide.shapes)
+    for section_name, positions in shape_index.items():
+        text = one_pager.get(section_name)
+        if text is None:
+            continue
+        for position in positions:
+            write_section(shapes[position].text_frame, section_name, str(text).strip())
+
+def build_presentation(one_pager):
+    """Returns the populated python-pptx Presentation, without saving it anywhere."""
+    prs, shape_index = load_template()
+    fill_slide(prs.slides[0], one_pager, shape_index)
+    return prs
+
+def render_pptx(one_pager, output_path=None):
+    """
+    Renders the one-pager fully in memory and returns it as a BytesIO (positioned at 0).
+    Nothing touches the filesystem unless output_path is given, in which case the same
+    bytes are also written there.
+    """
+    buffer = io.BytesIO()
+    with stage("render"):
+        build_presentation(one_pager).save(buffer)
+    if output_path is not None:
+        with open(output_path, "wb") as f:
+            f.write(buffer.getbuffer())
+    buffer.seek(0)
+    return buffer
+
+def populate_pptx(one_pager, output_path="data/output/updated_presentation.pptx"):
     """
-    Populates a PowerPoint presentation with text from df_text.
-    Each row of df_text should contain 'section_name' and 'output' columns.
+    Populates a PowerPoint presentation with the sections and roles of a OnePager.
+    The deck is saved at output_path (one file per CV in batch runs); use render_pptx
+    to get the bytes without writing to disk.
     """
-    prs = Presentation('data/input/SC&O OP VACIO - TEMPLATE 3 - New.pptx')
-    slide = prs.slides[0]
-
-    # Define sections where bullets should be applied
-    bullet_sections = {"industry experience", "functional experience", "certifications/training"}
-
-    for index, row in df_text.iterrows():
-        section_name = row["section_name"].strip().lower()
-        new_text = str(row["output"]).strip()
-        for shape in slide.shapes:
-            if not shape.has_text_frame:
-                continue
-
-            if shape.name.strip().lower() != row['section_name'].strip().lower():
-                continue
-
-            text_frame = shape.text_frame
-            text_frame.clear()
-            # new_text = row['output']
-
-            # --- Format lines depending on section ---
-            lines = new_text.splitlines()
-            if section_name.startswith("role"):
-                # Keep title without bullet and make it bold
-                title_line = f"**{lines[0].strip()}**"
-                formatted_lines = "\n".join([title_line] + [f"• {line}" for line in lines[1:]])
-            elif section_name in bullet_sections:
-                formatted_lines = "\n".join([f"• {line}" for line in lines])
-            else:
-                # No bullets for other sections
-                formatted_lines = "\n".join(lines)
-
-            text_frame.text = formatted_lines
-
-            # Apply styles
-            for paragraph in text_frame.paragraphs:
-                apply_bold_to_paragraph(paragraph)
-
-                # Handle NAME formatting
-                if shape.name.strip().lower() == 'name':
-                    run = paragraph.runs[0]
-                    run.font.name = "Graphik Black"
-                    run.font.size = Pt(42)
-                    run.font.color.rgb = RGBColor(255, 255, 255)
-                    run.text = run.text.upper().strip()
-
-                # Handle TOWER formatting
-                elif shape.name.strip().lower() == 'tower':
-                    run = paragraph.runs[0]
-                    run.font.name = "Graphik Black"
-                    run.font.size = Pt(24)
-                    run.font.color.rgb = RGBColor(255, 255, 255)
-                    run.text = run.text.upper().strip()
-
-                # Default formatting for other sections
-                else:
-                    for run in paragraph.runs:
-                        run.font.name = "Graphik"
-                        run.font.size = Pt(9)
-                        run.font.color.rgb = RGBColor(0, 0, 0)
-
-    output_path = "data/output/updated_presentation.pptx"
-    prs.save(output_path)
+    with stage("render"):
+        build_presentation(one_pager).save(output_path)
     print(f"✅ Presentation was successfully created")
     return output_path
\ No newline at end of file
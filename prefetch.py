@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from ingest_guard import CVRejected, sha256_of, spool
+from instrumentation import track_run
+from llm_scheduler import SPECULATIVE, TokenBucket, llm_scheduler, request_priority
+from one_pager import tower_id
+
+# Light module on purpose (imported by the app's landing page): the pipeline is only imported by
+# the prefetch workers, once a CV has been uploaded.
+
+PREFETCH_ENABLED = os.getenv("ONE_PAGER_PREFETCH_DISABLED", "").lower() not in ("1", "true", "yes")
+PREFETCH_WORKERS = int(os.getenv("ONE_PAGER_PREFETCH_WORKERS", "2"))
+# Tokens per minute the speculative calls may spend (estimated prompt + completion, 0 = unlimited)
+PREFETCH_TPM = int(os.getenv("ONE_PAGER_PREFETCH_TPM", "60000"))
+# An upload still waiting for a free prefetch worker after this many seconds is not started
+PREFETCH_MAX_AGE = 60
+MAX_SPECULATIONS = 256
+
+PENDING, RUNNING, READY, CANCELLED, SKIPPED, FAILED = "pending", "running", "ready", "cancelled", "skipped", "failed"
+
+
+class SpeculationCancelled(Exception):
+    """Raised inside a speculative stage whose result is no longer wanted."""
+
+
+def tower_matches(detected_tower, tower_selected):
+    """True if the TOWER written by default.md is the one the user chose ('CONTROL TOWER' ~ 'Control_Tower')."""
+    return tower_selected is None or tower_id(detected_tower) == tower_id(tower_selected)
+
+
+class Speculation:
+    """Prefetch state of one uploaded PDF (keyed on the sha256 of its bytes)."""
+
+    def __init__(self, key, file_name=None):
+        self.key = key
+        self.file_name = file_name
+        self.created_at = time.monotonic()
+        self.cancelled = threading.Event()
+        self.status = PENDING
+        self.reason = None
+        self.detected_tower = None
+        self.claimed = False
+        self.tower = None
+
+
+class Prefetcher:
+    """
+    Speculative work started as soon as a CV is uploaded, while the user is still choosing the
+    tower and the flavor: text extraction, then the SECTIONS call with default.md (it detects the
+    tower on its own). Both results go to pipeline_stages.stage_memo, where the job started by
+    Generate picks them up: the extracted text always, the SECTIONS answer if no flavor was chosen
+    and the detected tower is the chosen one (pipeline_stages.prefetched_sections).
+
+    Budget policy, so abandoned uploads cost little:
+    - the SECTIONS call is skipped when LLM requests are already queued in llm_scheduler, or when
+      the speculative tokens-per-minute budget (ONE_PAGER_PREFETCH_TPM) is spent;
+    - it runs at SPECULATIVE priority: behind the interactive calls, ahead of batch CVs;
+    - cancel() (another CV uploaded, upload removed) and claim() with choices that can't use it
+      stop the call between two streamed sections and close the stream.
+    A completed answer also lands in the LLM response cache, so even an unused one is not lost
+    if the same CV is generated later with default.md.
+    """
+
+    def __init__(self, workers=PREFETCH_WORKERS, tokens_per_minute=PREFETCH_TPM, enabled=PREFETCH_ENABLED,
+                 max_age=PREFETCH_MAX_AGE):
+        self.enabled = enabled
+        self.max_age = max_age
+        self._budget = TokenBucket(tokens_per_minute)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="one-pager-prefetch")
+        self._speculations = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"started": 0, "ready": 0, "claimed": 0, "cancelled": 0, "skipped": 0, "failed": 0}
+
+    # ---------- worker ----------
+    def _finish(self, speculation, status, reason=None):
+        with self._lock:
+            speculation.status = status
+            speculation.reason = reason
+            self._counters[status] += 1
+        if reason:
+            print(f"🔹 Prefetch of {speculation.file_name or speculation.key[:12]} {status}: {reason}")
+
+    def _admit(self, cv_text):
+        """None if the speculative SECTIONS call may run now (its tokens are then taken), else the reason why not."""
+        import cv_process_sort_gen as cv
+
+        if llm_scheduler.stats()["queue_depth"]:
+            return "LLM requests are queued"
+        messages, _ = cv.sections_prompt(cv_text, None)
+        tokens = cv.estimate_prompt_tokens(messages) + cv.COMPLETION_TOKENS_ESTIMATE
+        with self._lock:
+            if self._budget.wait_time(tokens) > 0:
+                return "speculative token budget spent"
+            self._budget.take(tokens)
+        return None
+
+    def _on_section(self, speculation, section_name, text):
+        if section_name != "TOWER":
+            return
+        with self._lock:
+            speculation.detected_tower = text
+            # Generate was already clicked with another tower: the answer can't be used
+            stale = speculation.claimed and not tower_matches(text, speculation.tower)
+        if stale:
+            speculation.cancelled.set()
+
+    def _run(self, speculation, pdf_file):
+        try:
+            self._speculate(speculation, pdf_file)
+        finally:
+            pdf_file.close()
+
+    def _speculate(self, speculation, pdf_file):
+        from pipeline_stages import extract_stage, prefetch_sections_stage
+
+        if speculation.cancelled.is_set():
+            return self._finish(speculation, CANCELLED)
+        if time.monotonic() - speculation.created_at > self.max_age:
+            return self._finish(speculation, SKIPPED, "waited too long for a prefetch worker")
+        speculation.status = RUNNING
+        try:
+            with request_priority(SPECULATIVE), track_run(source="prefetch", file=speculation.file_name):
+                cv_text = extract_stage(pdf_file)
+                if speculation.cancelled.is_set():
+                    return self._finish(speculation, CANCELLED)
+                reason = self._admit(cv_text)
+                if reason:
+                    return self._finish(speculation, SKIPPED, reason)
+                prefetch_sections_stage(
+                    cv_text, speculation.cancelled,
+                    on_section=lambda name, text: self._on_section(speculation, name, text),
+                )
+        except SpeculationCancelled:
+            self._finish(speculation, CANCELLED, "stopped before the end of the SECTIONS call")
+        except CVRejected as e:
+            self._finish(speculation, SKIPPED, str(e))
+        except Exception as e:
+            self._finish(speculation, FAILED, str(e))
+        else:
+            self._finish(speculation, READY)
+
+    # ---------- public API ----------
+    def start(self, pdf, file_name=None):
+        """
+        Starts the speculation for this PDF (bytes or file object, e.g. the UploadedFile) and
+        returns its key (None when disabled). Calling it again with the same contents (every
+        Streamlit rerun) does nothing, unless it was cancelled. The worker reads its own spooled
+        copy (ingest_guard.spool): a big upload waits on disk, not in memory.
+        """
+        if not self.enabled:
+            return None
+        key = sha256_of(pdf)
+        with self._lock:
+            speculation = self._speculations.get(key)
+            if speculation is not None and not speculation.cancelled.is_set():
+                self._speculations.move_to_end(key)
+                return key
+            speculation = self._speculations[key] = Speculation(key, file_name)
+            while len(self._speculations) > MAX_SPECULATIONS:
+                self._speculations.popitem(last=False)
+            self._counters["started"] += 1
+        try:
+            pdf_file, _ = spool(pdf)
+        except CVRejected as e:
+            self._finish(speculation, SKIPPED, str(e))
+            return key
+        self._executor.submit(self._run, speculation, pdf_file)
+        return key
+
+    def cancel(self, key):
+        """The upload is gone: stops its speculative call, unless Generate already claimed it."""
+        with self._lock:
+            speculation = self._speculations.get(key)
+            if speculation is None or speculation.claimed:
+                return
+        speculation.cancelled.set()
+
+    def claim(self, key, tower, flavor):
+        """
+        Called on Generate with the final choices. Returns True if the speculative SECTIONS answer
+        can be used (no flavor, and the detected tower, if already streamed, is the chosen one);
+        otherwise the call is cancelled. The extracted text is reused in both cases.
+        """
+        with self._lock:
+            speculation = self._speculations.get(key)
+            if speculation is None:
+                return False
+            usable = flavor is None and (speculation.detected_tower is None
+                                         or tower_matches(speculation.detected_tower, tower))
+            if usable:
+                speculation.claimed = True
+                speculation.tower = tower
+                self._counters["claimed"] += 1
+        if not usable:
+            speculation.cancelled.set()
+        return usable
+
+    def status(self, key):
+        with self._lock:
+            speculation = self._speculations.get(key)
+            return None if speculation is None else speculation.status
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    """Process-wide Prefetcher shared by every Streamlit session, created on first use."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher()
+        return _prefetcher
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+
+# Process-wide resources shared by every Streamlit session, the batch CLI and the workers.
+# Each one is rebuilt only when its source file changes on disk (mtime or size).
+
+_cache = {}
+_lock = threading.Lock()
+
+ENV_PATH = ".env"
+TOWER_FLAVOR_PATH = "tower_flavor.json"
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def cached_resource(name, source_path, loader):
+    """
+    Return loader() cached under `name`, invalidated when source_path changes.
+    The value is shared between threads: callers must not mutate it.
+    """
+    stamp = _file_stamp(source_path)
+    with _lock:
+        cached = _cache.get(name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    value = loader()
+    with _lock:
+        _cache[name] = (stamp, value)
+    return value
+
+
+def read_prompt_file(path):
+    """Contents of a roles/*.md or prompt_dictionary/*.md file."""
+    def load():
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return cached_resource(f"file:{path}", path, load)
+
+
+def load_tower_flavor(path=TOWER_FLAVOR_PATH):
+    """Parsed tower_flavor.json: {tower: [flavors]}."""
+    def load():
+        with open(path, "r") as f:
+            return json.load(f)
+    return cached_resource(f"json:{path}", path, load)
+
+
+def get_openai_client():
+    """
+    OpenAI client with a pooled, keep-alive HTTP connection, built on first use and rebuilt if
+    the .env file changes (e.g. a rotated OPENAI_API_KEY).
+    """
+    def build():
+        from dotenv import load_dotenv
+        from openai import OpenAI
+
+        load_dotenv(ENV_PATH, override=True)
+        try:
+            import httpx
+            from openai import DefaultHttpxClient
+
+            http_client = DefaultHttpxClient(
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60),
+            )
+        except ImportError:
+            # SDK builds without httpx: its own default client is pooled as well
+            http_client = None
+        # Retries are done by llm_scheduler (backoff + rate limits shared by every caller)
+        return OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=http_client,
+            max_retries=0,
+            timeout=float(os.getenv("LLM_TIMEOUT", "120")),
+        )
+    return cached_resource("openai_client", ENV_PATH, build)
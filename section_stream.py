@@ -0,0 +1,102 @@
+import json
+
+_decoder = json.JSONDecoder()
+
+
+class IncrementalSectionParser:
+    """
+    Incremental parser for the SECTIONS answer, a JSON object such as
+    {"NAME": "...", "TOWER": "...", "PROFILE OVERVIEW": "..."}.
+
+    feed() receives the streamed text chunk by chunk and returns the (key, value) pairs that
+    became complete with that chunk, so each section can be shown as soon as it arrives.
+    Anything before the first '{' (stray prose, ```json fences) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = None  # index in buffer right after the last consumed token
+        self.sections = {}
+        self.done = False
+
+    def _skip(self, chars):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in chars:
+            self.pos += 1
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        found = []
+        if self.done:
+            return found
+        if self.pos is None:
+            start = self.buffer.find("{")
+            if start == -1:
+                return found
+            self.pos = start + 1
+
+        while True:
+            self._skip(" \t\r\n,")
+            if self.pos >= len(self.buffer):
+                break
+            if self.buffer[self.pos] == "}":
+                self.done = True
+                break
+            try:
+                key, key_end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                break  # key still incomplete
+            colon = key_end
+            while colon < len(self.buffer) and self.buffer[colon] in " \t\r\n":
+                colon += 1
+            if colon >= len(self.buffer) or self.buffer[colon] != ":":
+                break
+            value_start = colon + 1
+            while value_start < len(self.buffer) and self.buffer[value_start] in " \t\r\n":
+                value_start += 1
+            try:
+                value, value_end = _decoder.raw_decode(self.buffer, value_start)
+            except json.JSONDecodeError:
+                break  # value still incomplete
+            # Numbers/literals could still be growing: only accept them once a delimiter follows
+            if not isinstance(value, (str, list, dict)):
+                rest = self.buffer[value_end:].lstrip()
+                if not rest or rest[0] not in ",}":
+                    break
+            self.pos = value_end
+            if isinstance(value, list):
+                value = "\n".join(str(item) for item in value)
+            self.sections[key] = value
+            found.append((key, value))
+        return found
+
+
+class RoleBlockSplitter:
+    """
+    Splits the streamed ROLES answer into role blocks (separated by a blank line), returning
+    each block as soon as the next one starts. close() returns the last pending block.
+    """
+
+    def __init__(self, max_roles=4):
+        self.buffer = ""
+        self.max_roles = max_roles
+        self.emitted = 0
+
+    def _take(self, blocks):
+        out = []
+        for block in blocks:
+            block = block.strip()
+            if block and self.emitted < self.max_roles:
+                out.append(block)
+                self.emitted += 1
+        return out
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        if "\n\n" not in self.buffer:
+            return []
+        *complete, self.buffer = self.buffer.split("\n\n")
+        return self._take(complete)
+
+    def close(self):
+        rest, self.buffer = self.buffer, ""
+        return self._take([rest])
@@ -1,15 +1,21 @@
 import streamlit as st
-import pdfplumber
-import pandas as pd
-import io
 import json
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
-from cv_process_sort_gen import *
-from populate_pptx import *
-from pptx import Presentation
-from PIL import Image
+
+# Before the imports below: they read their settings (LLM_*, ONE_PAGER_*) from the environment
+load_dotenv()
+
+from llm_cache import response_cache
+from resources import load_tower_flavor
+from instrumentation import to_prometheus
+from job_queue import DONE, FAILED, QUEUED, RUNNING, get_job_queue
+from llm_scheduler import llm_scheduler
+from prefetch import get_prefetcher
+from ingest_guard import MAX_UPLOAD_MB, CVRejected, check_pdf
+
+# The PDF / LLM / PPTX stack (pdfplumber, openai, python-pptx, pandas) is only imported by the
+# job workers and by show_result, so the landing page renders before any of it is loaded.
 
 # --------------------
 # Custom CSS for Accenture Branding
@@ -207,6 +213,12 @@ def inject_custom_css():
         </style>
     """, unsafe_allow_html=True)
 
+@st.cache_resource
+def load_logo(path, mtime_ns):
+    """Logo read once per process; mtime_ns is part of the cache key so a new file is picked up."""
+    with open(path, "rb") as f:
+        return f.read()
+
 # --------------------
 # Initialize App
 # --------------------
@@ -217,7 +229,7 @@ col1, col2 = st.columns([1, 4])
 with col1:
     try:
         # Load and display Accenture logo
-        logo = Image.open("accenture-logo.png")  # Make sure the logo is in the same directory
+        logo = load_logo("accenture-logo.png", os.stat("accenture-logo.png").st_mtime_ns)  # Make sure the logo is in the same directory
         st.image(logo, width=120)
     except:
         # Fallback if logo file is not found
@@ -243,17 +255,38 @@ st.markdown("---")
 
 # File Upload Section
 st.markdown("### 📁 Upload CV")
-uploaded_pdf = st.file_uploader("Upload a CV in PDF format", type=["pdf"], help="Please upload the candidate's CV in PDF format")
+uploaded_pdf = st.file_uploader("Upload a CV in PDF format", type=["pdf"], help="Please upload the candidate's CV in PDF format",
+                                max_upload_size=MAX_UPLOAD_MB)
+
+# Size / page limits (ingest_guard.py), checked once per uploaded file before any work starts
+if uploaded_pdf is not None:
+    if st.session_state.get("upload_check", (None,))[0] != uploaded_pdf.file_id:
+        try:
+            check_pdf(uploaded_pdf)
+            st.session_state.upload_check = (uploaded_pdf.file_id, None)
+        except CVRejected as e:
+            st.session_state.upload_check = (uploaded_pdf.file_id, str(e))
+    upload_error = st.session_state.upload_check[1]
+    if upload_error:
+        st.error(f"❌ {upload_error}")
+        uploaded_pdf = None
+
+# Extraction and the default.md SECTIONS call start right away (prefetch.py), while the tower and
+# the flavor are chosen below; Generate reuses them when the choices allow it.
+prefetcher = get_prefetcher()
+prefetch_key = prefetcher.start(uploaded_pdf, uploaded_pdf.name) if uploaded_pdf else None
+if st.session_state.get("prefetch_key") not in (None, prefetch_key):
+    # Another CV was uploaded or the upload was removed
+    prefetcher.cancel(st.session_state.prefetch_key)
+st.session_state.prefetch_key = prefetch_key
 
 st.markdown('<div class="section-spacing"></div>', unsafe_allow_html=True)
 
 # --------------------
 # Choose Tower Section
 # --------------------
-file_name = 'tower_flavor.json' 
-
-with open(file_name, 'r') as file:
-    tower_flavor_df = json.load(file)
+# Parsed once per process, re-read only if tower_flavor.json changes
+tower_flavor_df = load_tower_flavor()
 
 # Initialize session state for tower and flavor
 if 'tower_selected' not in st.session_state:
@@ -319,53 +352,134 @@ if st.session_state.tower_selected:
 # --------------------
 # Generate Section
 # --------------------
+# Generation runs in the background job queue: this script run only submits the job and
+# then polls it, so reruns (download button, expanders) and reconnects never lose the work.
+# The job id is kept in the URL (?job=...) to find it again after a page reload.
+job_queue = get_job_queue()
+
+
+def show_partial(job):
+    for section_name, text in job["partial"]:
+        st.markdown(f"**{section_name}**")
+        st.markdown(text)
+
+
+@st.fragment(run_every="1s")
+def job_progress(job_id):
+    """Polls the job every second, showing each section as soon as the worker has it."""
+    job = job_queue.get(job_id)
+    if job is None or job["status"] in (DONE, FAILED):
+        st.rerun()
+    if job["status"] == QUEUED:
+        label = f"⏳ Queued ({job_queue.position(job_id)} CVs ahead)..."
+    else:
+        label = "⏳ Processing CV and generating PowerPoint..."
+    with st.status(label, expanded=True):
+        show_partial(job)
+
+
+def show_result(job_id, job):
+    import pandas as pd
+
+    # Show preview of the data
+    with st.expander("📊 Preview Extracted Data"):
+        st.dataframe(job_queue.result_dataframe(job_id))
+
+    st.success("✅ One-pager generated successfully!")
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        st.metric("Tower Selected", job["params"]["tower"])
+    with col2:
+        profile_display = job["params"]["flavor"] or "None (Original)"
+        st.metric("Profile", profile_display)
+
+    cache_stats = response_cache.stats()
+    st.caption(
+        f"LLM cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+
+    # Where the seconds and the dollars of this one-pager went
+    with st.expander("⏱️ Performance"):
+        metrics = job["metrics"]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total time", f"{metrics['total_seconds']:.1f}s")
+        with col2:
+            st.metric("Tokens (prompt / completion)", f"{metrics['prompt_tokens']} / {metrics['completion_tokens']}")
+        with col3:
+            st.metric("Estimated cost", f"${metrics['cost_usd']:.4f}")
+        if metrics.get("peak_rss_mb"):
+            st.caption(f"Peak memory of the app process during this run: {metrics['peak_rss_mb']:.0f} MB")
+        st.dataframe(pd.DataFrame(
+            [{"stage": name, "seconds": seconds} for name, seconds in metrics["stages"].items()]
+        ))
+        cached_share = metrics["cached_tokens"] / metrics["prompt_tokens"] if metrics["prompt_tokens"] else 0.0
+        st.caption(
+            f"LLM calls: {metrics['llm_calls']} · cached tokens: {metrics['cached_tokens']} "
+            f"({cached_share:.0%} of the prompt) · "
+            f"cache hits: {metrics['llm_cache_hits']} · retries: {metrics['retries']} · "
+            f"queued for rate limits: {metrics['queue_wait_seconds']:.1f}s"
+        )
+        reused = metrics["metadata"].get("reused_stages")
+        if reused:
+            st.caption(f"♻️ Reused from an earlier try of this CV or prefetched on upload: {', '.join(reused)}")
+        scheduler_stats = llm_scheduler.stats()
+        st.caption(
+            f"LLM scheduler: {scheduler_stats['active']}/{scheduler_stats['max_concurrency']} in flight, "
+            f"{scheduler_stats['queue_depth']} queued, wait p95 {scheduler_stats['wait_p95_s']:.1f}s"
+        )
+        st.download_button("Export run (JSON lines)", data=json.dumps(metrics, ensure_ascii=False) + "\n",
+                           file_name=f"one_pager_run_{metrics['run_id']}.jsonl", mime="application/json")
+        st.download_button("Export metrics (Prometheus)", data=to_prometheus() + llm_scheduler.to_prometheus(),
+                           file_name="one_pager_metrics.prom", mime="text/plain")
+
+    # 3️⃣ Provide download button
+    st.download_button(
+        label="📊 Download OnePager",
+        data=job_queue.result_pptx(job_id),
+        file_name="OnePager.pptx",
+        mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    )
+
+
 if uploaded_pdf and st.session_state.tower_selected:
     st.markdown("### 🚀 Generate One-Pager")
     
     # Add a generate button for better UX
     if st.button("Generate One-Pager", type="primary"):
-        with st.spinner("⏳ Processing CV and generating PowerPoint..."):
-            try:
-                # 1️⃣ Extract and structure CV content
-                df = generate_one_pager(
-                    cv_path=uploaded_pdf, 
-                    tower_selected=st.session_state.tower_selected, 
-                    flavor=flavor
-                )
-
-                # Show preview of the data
-                with st.expander("📊 Preview Extracted Data"):
-                    st.dataframe(df)
-
-                # 2️⃣ Generate the PowerPoint file
-                pptx_path = populate_pptx(df)
-
-                # 3️⃣ Read file bytes for download
-                with open(pptx_path, "rb") as f:
-                    pptx_bytes = f.read()
-
-                st.success("✅ One-pager generated successfully!")
-                
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    st.metric("Tower Selected", st.session_state.tower_selected)
-                with col2:
-                    profile_display = flavor if flavor else "None (Original)"
-                    st.metric("Profile", profile_display)
-
-                # 4️⃣ Provide download button
-                st.download_button(
-                    label="📊 Download OnePager",
-                    data=pptx_bytes,
-                    file_name="OnePager.pptx",
-                    mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                )
-
-            except Exception as e:
-                st.error(f"❌ Error while generating PowerPoint: {str(e)}")
-                st.info("💡 Tip: Check if the PDF is readable and contains text content.")
-    
+        if prefetch_key:
+            prefetcher.claim(prefetch_key, tower=st.session_state.tower_selected, flavor=flavor)
+        try:
+            job_id = job_queue.submit(
+                uploaded_pdf,
+                uploaded_pdf.name,
+                tower=st.session_state.tower_selected,
+                flavor=flavor,
+            )
+            st.query_params["job"] = job_id
+        except CVRejected as e:
+            st.error(f"❌ {e}")
+
 elif uploaded_pdf and not st.session_state.tower_selected:
     st.warning("⚠️ Please select a Tower to generate the one-pager.")
-elif not uploaded_pdf:
-    st.info("📁 Please upload a PDF file to get started.")
\ No newline at end of file
+elif not uploaded_pdf and "job" not in st.query_params:
+    st.info("📁 Please upload a PDF file to get started.")
+
+job_id = st.query_params.get("job")
+job = job_queue.get(job_id) if job_id else None
+if job is not None:
+    st.caption(f"📄 {job['params']['file_name']} · {job['params']['tower']} · "
+               f"{job['params']['flavor'] or 'None (Original)'}")
+    if job["status"] in (QUEUED, RUNNING):
+        job_progress(job_id)
+    elif job["status"] == FAILED:
+        with st.expander("Partial output", expanded=False):
+            show_partial(job)
+        st.error(f"❌ Error while generating PowerPoint: {job['error']}")
+        st.info("💡 Tip: Check if the PDF is readable and contains text content.")
+    else:
+        show_result(job_id, job)
+elif job_id:
+    st.warning("⚠️ This one-pager is no longer available, please generate it again.")